@@ -10,7 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
+
 from pathlib import Path
+from typing import Any
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -42,6 +45,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    "tictactoe.routers.PrimaryReplicaMiddleware",
+    # Must come before the session and authentication middleware, which it skips
+    "tictactoe.middleware.PollingMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -74,13 +80,106 @@ WSGI_APPLICATION = 'game.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
+DATABASE_NAME = os.environ.get("GAME_DATABASE_NAME", BASE_DIR / "db.sqlite3")
+
+DATABASES: dict[str, dict[str, Any]] = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': DATABASE_NAME,
+        # Tests use a file instead of the default in-memory database, so concurrent
+        # requests from several threads see the same locking behaviour as in production
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+    }
+}
+
+DATABASE_ROUTERS = ["tictactoe.routers.PrimaryReplicaRouter"]
+
+# Aliases of the databases that serve the reads of the GET requests. Writes, and the
+# requests of a client that has written in the last TICTACTOE_REPLICA_PIN_SECONDS,
+# always use the default database
+TICTACTOE_REPLICA_DATABASES: list[str] = []
+TICTACTOE_REPLICA_PIN_SECONDS = 5
+
+# Replica in a separate SQLite file, kept up to date with `manage.py sync_replicas`
+if replica_name := os.environ.get("GAME_DATABASE_REPLICA"):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": replica_name,
+        "TEST": {"MIRROR": "default"},
     }
+    TICTACTOE_REPLICA_DATABASES.append("replica")
+
+# Profile tuned for concurrent access in production, enabled with
+# GAME_DATABASE_PROFILE=sqlite-tuned. WAL lets readers work while a writer is active,
+# and writers wait for each other instead of failing with "database is locked"
+if os.environ.get("GAME_DATABASE_PROFILE") == "sqlite-tuned":
+    DATABASES["default"] |= {
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+            "timeout": 20,
+            # Take the write lock when the transaction begins, so it is not necessary
+            # to upgrade a read lock, which fails immediately if there is a writer
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+
+    # Optional read-only connection to the same file for the GET requests. It was
+    # slower than the default connection in `benchmark_moves`, so measure before using it
+    if os.environ.get("GAME_DATABASE_READONLY"):
+        DATABASES["readonly"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": f"file:{DATABASE_NAME}?mode=ro",
+            "CONN_MAX_AGE": 600,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {"timeout": 20},
+            "TEST": {"MIRROR": "default"},
+        }
+        TICTACTOE_REPLICA_DATABASES.append("readonly")
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.0/ref/settings/#caches
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # The viewer tracking needs about two entries per viewer of each board. Evicted
+    # viewers are counted again, so the cache must fit all of them (the default limit
+    # is 300 entries). Use a shared cache (e.g. Redis) with several processes
+    "presence": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "presence",
+        "OPTIONS": {"MAX_ENTRIES": 200_000},
+    },
 }
 
+# Cache used to track the viewers of the boards, and seconds after which a viewer that
+# stops polling a board is no longer counted
+TICTACTOE_PRESENCE_CACHE = "presence"
+TICTACTOE_PRESENCE_TTL = 10
+
+
+# Limits of the moves of each user on each board: bursts of TICTACTOE_MOVE_BURST moves,
+# refilled at TICTACTOE_MOVE_RATE moves per second. Repeating the last move within
+# TICTACTOE_DUPLICATE_MOVE_SECONDS (e.g. double clicks) is ignored
+TICTACTOE_MOVE_RATE = 2
+TICTACTOE_MOVE_BURST = 4
+TICTACTOE_DUPLICATE_MOVE_SECONDS = 1
+# Number of user and board pairs that are remembered per process
+TICTACTOE_MOVE_THROTTLE_SIZE = 100_000
+
+
+# Cache of the boards being played, see tictactoe/board_cache.py. None keeps up to
+# TICTACTOE_BOARD_CACHE_SIZE boards in the memory of each process, which is only correct
+# with a single process. Use the alias of a shared cache with several processes
+TICTACTOE_BOARD_CACHE = None
+TICTACTOE_BOARD_CACHE_SIZE = 10_000
+# Seconds after which cached boards are loaded again, so a lost update heals
+TICTACTOE_BOARD_CACHE_TTL = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -0,0 +1,50 @@
+"""
+Django settings for the game workers.
+
+Workers only serve the game endpoints of the tictactoe app (board polling, moves, the
+JSON API...), so they skip the admin, messages and static files apps and their
+middleware, which makes them start and answer faster. Pages, authentication and the
+admin area are served by processes that use the regular settings.
+
+Select them with DJANGO_SETTINGS_MODULE=game.settings_worker.
+"""
+
+from .settings import *  # noqa: F401, F403
+from .settings import TEMPLATES, TICTACTOE_BOARD_CACHE
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "tictactoe.apps.TictactoeConfig",
+]
+
+MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "tictactoe.routers.PrimaryReplicaMiddleware",
+    "tictactoe.middleware.PollingMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+]
+
+ROOT_URLCONF = "game.urls_worker"
+
+TEMPLATES = [
+    TEMPLATES[0]
+    | {
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+            ],
+        },
+    }
+]
+
+# Workers run in several processes, and a board cached in the memory of one of them
+# would not see the moves played through the others. Boards are only cached if
+# TICTACTOE_BOARD_CACHE points to a shared cache
+if TICTACTOE_BOARD_CACHE is None:
+    TICTACTOE_BOARD_CACHE_SIZE = 0
@@ -0,0 +1,14 @@
+"""
+URL configuration for the game workers, see settings_worker.py.
+
+Only the game endpoints are routed. The pages link to the login and admin views, which
+workers do not serve.
+"""
+
+from django.urls import include, path
+
+from tictactoe.urls import app_name, game_urlpatterns
+
+urlpatterns = [
+    path("tictactoe/", include((game_urlpatterns, app_name))),
+]
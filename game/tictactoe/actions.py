@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+
+from .board_cache import board_cache
+from .game import Game, GameState
+from .models import Board, FieldState
+from .tournament import on_board_finished
+
+
+class ForbiddenAction(Exception):
+    """Raised when a user is not allowed to perform an action on a board."""
+
+
+def join_board(board: Board, user: User) -> None:
+    # Seats are only taken if they are still free in the database, so two users that
+    # join at the same time cannot both take the same seat
+    boards = Board.objects.filter(pk=board.pk)
+    if not board.crosses_player_id and boards.filter(crosses_player=None).update(
+        crosses_player=user
+    ):
+        board.crosses_player = user
+    elif not board.noughts_player_id and boards.filter(noughts_player=None).update(
+        noughts_player=user
+    ):
+        board.noughts_player = user
+    else:
+        raise ForbiddenAction("No free space available to join board")
+
+    # The state of the board may have changed since it was read, so the cached board
+    # is loaded again instead of replaced with this one
+    board_cache.invalidate(board.id)
+
+
+def play_move(board: Board, user: User, row: int, col: int) -> GameState:
+    """Occupies a field of the board with the symbol of the user and saves the board.
+
+    Invalid moves raise an exception with a message that can be shown to the user.
+    """
+    if user.id == board.crosses_player_id:
+        new_field_state = FieldState.X
+    elif user.id == board.noughts_player_id:
+        new_field_state = FieldState.O
+    else:
+        raise ForbiddenAction("You must join the board to perform this action")
+
+    game = Game(board)
+    previous_state = board.state
+    game.occupy_field(row, col, new_field_state)
+
+    # The board is only saved if nobody else has moved since it was read, otherwise
+    # one of two concurrent moves would overwrite the other
+    if not Board.objects.filter(pk=board.pk, state=previous_state).update(
+        state=board.state
+    ):
+        board_cache.invalidate(board.id)
+        raise Exception("The board has changed, please try again")
+    board_cache.put(board)
+
+    game_state = game.state
+    if game_state != GameState.ON_GOING:
+        on_board_finished(board)
+
+    return game_state
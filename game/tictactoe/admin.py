@@ -1,3 +1,88 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.http import HttpRequest, HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import URLPattern, path
 
-# Register your models here.
+from . import presence
+from .models import Board, Match, Tournament
+
+
+@admin.register(Board)
+class BoardAdmin(admin.ModelAdmin):
+    list_display = ["id", "crosses_player", "noughts_player", "state", "viewer_count"]
+    list_select_related = ["crosses_player", "noughts_player"]
+    raw_id_fields = ["crosses_player", "noughts_player"]
+
+    def get_changelist_instance(self, request: HttpRequest) -> ChangeList:
+        changelist = super().get_changelist_instance(request)
+        # The viewers of all the boards of the page are read from the cache at once
+        viewer_counts = presence.tracker.count_many(
+            board.id for board in changelist.result_list
+        )
+        for board in changelist.result_list:
+            setattr(board, "viewer_count", viewer_counts[board.id])
+        return changelist
+
+    @admin.display(description="Viewers")
+    def viewer_count(self, board: Board) -> int:
+        return getattr(board, "viewer_count", 0)
+
+    def get_urls(self) -> list[URLPattern]:
+        return [
+            path(
+                "hot/",
+                self.admin_site.admin_view(self.hot_boards_view),
+                name="tictactoe_board_hot",
+            ),
+            *super().get_urls(),
+        ]
+
+    def hot_boards_view(self, request: HttpRequest) -> HttpResponse:
+        hot_boards = presence.tracker.hot_boards()
+        board_map = Board.objects.select_related(
+            "crosses_player", "noughts_player"
+        ).in_bulk([board_id for board_id, _ in hot_boards])
+
+        context = self.admin_site.each_context(request) | {
+            "title": "Boards with most viewers",
+            "opts": self.model._meta,
+            "board_counts": [
+                (board_map[board_id], count)
+                for board_id, count in hot_boards
+                if board_id in board_map
+            ],
+        }
+        return TemplateResponse(
+            request, "admin/tictactoe/board/hot_boards.html", context
+        )
+
+
+class MatchInline(admin.TabularInline):
+    model = Match
+    fields = ["round", "index", "board", "is_finished", "winner"]
+    readonly_fields = ["round", "index", "board", "is_finished", "winner"]
+    ordering = ["round", "index"]
+    extra = 0
+    can_delete = False
+
+
+@admin.register(Tournament)
+class TournamentAdmin(admin.ModelAdmin):
+    list_display = ["name", "kind", "current_round", "pending_matches", "winner"]
+    # Rounds are scheduled from the players when the tournament starts, so they cannot
+    # be changed afterwards
+    readonly_fields = [
+        "kind",
+        "players",
+        "current_round",
+        "pending_matches",
+        "is_finished",
+        "winner",
+    ]
+    inlines = [MatchInline]
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        # Tournaments must be started when they are created, which is done by the
+        # create_tournament command
+        return False
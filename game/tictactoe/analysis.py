@@ -0,0 +1,96 @@
+import functools
+
+from .game import Game, GameState
+from .models import Board, FieldState
+
+# The eight symmetries of the board (rotations and reflections) as permutations of the
+# fields, which are numbered row by row: field i of the transformed board is field
+# permutation[i] of the original one
+IDENTITY = (0, 1, 2, 3, 4, 5, 6, 7, 8)
+ROTATION = (6, 3, 0, 7, 4, 1, 8, 5, 2)
+REFLECTION = (2, 1, 0, 5, 4, 3, 8, 7, 6)
+
+
+def compose(first: tuple[int, ...], second: tuple[int, ...]) -> tuple[int, ...]:
+    """Returns the permutation that applies `first` and then `second`."""
+    return tuple(first[i] for i in second)
+
+
+def generate_symmetries() -> list[tuple[int, ...]]:
+    rotations: list[tuple[int, ...]] = [IDENTITY]
+    for _ in range(3):
+        rotations.append(compose(rotations[-1], ROTATION))
+    return rotations + [compose(rotation, REFLECTION) for rotation in rotations]
+
+
+SYMMETRIES = generate_symmetries()
+
+# Scores of the outcomes from the point of view of crosses
+OUTCOME_SCORES = {
+    GameState.CROSSES_WON: 1,
+    GameState.TIE: 0,
+    GameState.NOUGHTS_WON: -1,
+}
+
+
+class Analysis:
+    outcome: GameState
+    best_fields: list[int]
+
+    def __init__(self, outcome: GameState, best_fields: list[int]) -> None:
+        # Outcome of the game if both players play perfectly from now on
+        self.outcome = outcome
+        # Fields, numbered row by row, that lead to that outcome for the side to move
+        self.best_fields = best_fields
+
+
+def canonicalize(state: str) -> tuple[str, tuple[int, ...]]:
+    """Returns the smallest of the symmetric states of the given one, together with the
+    permutation that transforms the given state into it.
+    """
+    return min(
+        ("".join(state[i] for i in symmetry), symmetry) for symmetry in SYMMETRIES
+    )
+
+
+def analyse(state: str) -> Analysis:
+    canonical_state, symmetry = canonicalize(state)
+    outcome, canonical_best_fields = solve(canonical_state)
+    return Analysis(outcome, sorted(symmetry[field] for field in canonical_best_fields))
+
+
+@functools.cache
+def solve(canonical_state: str) -> tuple[GameState, tuple[int, ...]]:
+    """Finds the outcome and the best moves of a canonical state with a minimax search.
+
+    Results are kept for the lifetime of the process. Since all the symmetric states
+    share the same entry, the whole game fits in a few hundred entries, and after they
+    are filled analysing any position does not need any search at all.
+    """
+    game_state = Game(Board(state=canonical_state)).state
+    if game_state != GameState.ON_GOING:
+        return game_state, ()
+
+    crosses_count = canonical_state.count(FieldState.X.value)
+    noughts_count = canonical_state.count(FieldState.O.value)
+    field_state = FieldState.X if crosses_count == noughts_count else FieldState.O
+    # Crosses look for the highest score and noughts for the lowest
+    sign = 1 if field_state == FieldState.X else -1
+
+    outcomes: dict[int, GameState] = {}
+    for field, value in enumerate(canonical_state):
+        if value == FieldState.EMPTY.value:
+            next_state = (
+                canonical_state[:field]
+                + field_state.value
+                + canonical_state[field + 1 :]
+            )
+            outcomes[field] = solve(canonicalize(next_state)[0])[0]
+
+    best_score = max(sign * OUTCOME_SCORES[outcome] for outcome in outcomes.values())
+    best_fields = tuple(
+        field
+        for field, outcome in outcomes.items()
+        if sign * OUTCOME_SCORES[outcome] == best_score
+    )
+    return outcomes[best_fields[0]], best_fields
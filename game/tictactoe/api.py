@@ -0,0 +1,249 @@
+"""JSON API for non-browser clients like bots and mobile apps.
+
+Boards are returned in a compact format:
+
+    {"id": 1, "state": "X  O     ", "version": 2, "turn": "X", "result": "on_going",
+     "crosses": "alice", "noughts": "bob"}
+
+The state lists the nine fields row by row. With `?format=int` it is encoded as an
+integer instead, where field `i` is the i-th base-3 digit (0 empty, 1 X, 2 O). The
+version is the number of moves played, so clients can poll the board with
+`?version=<n>` and get an empty 304 response while it does not change.
+
+Clients log in with `login`, which sets the session cookie and returns the CSRF token
+that must be sent in the X-CSRFToken header of the following POST requests.
+"""
+
+import json
+from typing import Any
+
+from django.contrib.auth import authenticate, login as auth_login
+from django.db.models import Q, QuerySet
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+
+from . import actions
+from .analysis import analyse
+from .board_cache import board_cache
+from .game import Game, GameState
+from .models import Board, FieldState
+from .throttle import TOO_MANY_MOVES_MESSAGE, ThrottleResult, move_throttle
+
+FIELD_STATE_DIGITS = {
+    FieldState.EMPTY.value: 0,
+    FieldState.X.value: 1,
+    FieldState.O.value: 2,
+}
+
+# Moves accepted in a single batch request
+MAX_BATCH_MOVES = 100
+
+
+def json_response(data: Any, status: int = 200) -> JsonResponse:
+    return JsonResponse(
+        data, status=status, safe=False, json_dumps_params={"separators": (",", ":")}
+    )
+
+
+def error_response(message: str, status: int) -> JsonResponse:
+    return json_response({"error": message}, status=status)
+
+
+def encode_state(state: str, as_int: bool) -> str | int:
+    if not as_int:
+        return state
+    return sum(FIELD_STATE_DIGITS[field] * 3**i for i, field in enumerate(state))
+
+
+def get_version(board: Board) -> int:
+    return board.move_count
+
+
+def serialize_board(board: Board, as_int: bool = False) -> dict[str, Any]:
+    game_state = Game(board).state
+    turn = None
+    if game_state == GameState.ON_GOING:
+        crosses_count = board.state.count(FieldState.X.value)
+        noughts_count = board.state.count(FieldState.O.value)
+        turn = FieldState.X if crosses_count == noughts_count else FieldState.O
+
+    return {
+        "id": board.id,
+        "state": encode_state(board.state, as_int),
+        "version": get_version(board),
+        "turn": turn.value if turn else None,
+        "result": game_state.name.lower(),
+        "crosses": board.crosses_player.username if board.crosses_player else None,
+        "noughts": board.noughts_player.username if board.noughts_player else None,
+    }
+
+
+def wants_int_format(request: HttpRequest) -> bool:
+    return request.GET.get("format") == "int"
+
+
+def get_boards_with_players() -> QuerySet[Board]:
+    return Board.objects.select_related("crosses_player", "noughts_player")
+
+
+@csrf_exempt
+@require_POST
+def login(request: HttpRequest) -> HttpResponse:
+    """Logs in with `{"username": ..., "password": ...}` and returns the CSRF token.
+
+    Clients have no token before logging in, so CSRF is not checked here. Only JSON
+    bodies are accepted instead, which browsers do not send to other sites without a
+    CORS preflight, so other sites cannot log users in to a different account.
+    """
+    if request.content_type != "application/json":
+        return error_response("The body must be JSON", 415)
+
+    try:
+        credentials = json.loads(request.body)
+        username, password = credentials["username"], credentials["password"]
+    except (ValueError, KeyError, TypeError):
+        return error_response("Invalid credentials", 400)
+
+    user = authenticate(request, username=username, password=password)
+    if user is None:
+        return error_response("Invalid username or password", 400)
+
+    auth_login(request, user)
+    # Logging in rotates the CSRF token, so the new one is returned
+    return json_response(
+        {"username": user.get_username(), "csrf_token": get_token(request)}
+    )
+
+
+@require_http_methods(["GET", "POST"])
+def boards(request: HttpRequest) -> HttpResponse:
+    """Lists the boards of the user (`?filter=open` for the ones they can join), or
+    creates a new board with the user as crosses player on POST.
+    """
+    if not request.user.is_authenticated:
+        return error_response("You must be logged in to perform this action", 403)
+
+    as_int = wants_int_format(request)
+
+    if request.method == "POST":
+        new_board = Board.objects.create(crosses_player=request.user)
+        return json_response(serialize_board(new_board, as_int), status=201)
+
+    if request.GET.get("filter") == "open":
+        board_list = get_boards_with_players().filter(
+            (Q(crosses_player=None) & ~Q(noughts_player=request.user))
+            | (~Q(crosses_player=request.user) & Q(noughts_player=None))
+        )
+    else:
+        board_list = get_boards_with_players().filter(
+            Q(crosses_player=request.user) | Q(noughts_player=request.user)
+        )
+
+    return json_response([serialize_board(board, as_int) for board in board_list])
+
+
+@require_GET
+def board(request: HttpRequest, board_id: int) -> HttpResponse:
+    try:
+        board = board_cache.get_or_load(board_id)
+    except Board.DoesNotExist:
+        return error_response(f"Board {board_id} does not exist", 404)
+
+    if request.GET.get("version") == str(get_version(board)):
+        return HttpResponse(status=304)
+
+    return json_response(serialize_board(board, wants_int_format(request)))
+
+
+@require_GET
+def board_analysis(request: HttpRequest, board_id: int) -> HttpResponse:
+    """Returns the outcome of the board with perfect play and the best moves for the
+    side to move, numbered like in `moves`. Used for hints and post-game reviews.
+    """
+    try:
+        board = Board.objects.get(pk=board_id)
+    except Board.DoesNotExist:
+        return error_response(f"Board {board_id} does not exist", 404)
+
+    analysis = analyse(board.state)
+    return json_response(
+        {
+            "id": board.id,
+            "version": get_version(board),
+            "outcome": analysis.outcome.name.lower(),
+            "best_moves": analysis.best_fields,
+        }
+    )
+
+
+@require_POST
+def join_board(request: HttpRequest, board_id: int) -> HttpResponse:
+    if not request.user.is_authenticated:
+        return error_response("You must be logged in to perform this action", 403)
+
+    try:
+        board = get_boards_with_players().get(pk=board_id)
+    except Board.DoesNotExist:
+        return error_response(f"Board {board_id} does not exist", 404)
+
+    try:
+        actions.join_board(board, request.user)  # type: ignore
+    except actions.ForbiddenAction as e:
+        return error_response(str(e), 403)
+
+    return json_response(serialize_board(board, wants_int_format(request)))
+
+
+@require_POST
+def moves(request: HttpRequest) -> HttpResponse:
+    """Plays a batch of moves, possibly on different boards.
+
+    The body is `{"moves": [{"board": 1, "field": 4}, ...]}`, where fields are numbered
+    row by row from 0 to 8. Moves are played in order and independently of each other,
+    and the response contains one result per move: the board after the move, or an
+    error message if the move was not valid.
+    """
+    if not request.user.is_authenticated:
+        return error_response("You must be logged in to perform this action", 403)
+
+    try:
+        move_list = json.loads(request.body)["moves"]
+        parsed_moves = [(int(move["board"]), int(move["field"])) for move in move_list]
+    except (ValueError, KeyError, TypeError):
+        return error_response("Invalid moves", 400)
+
+    if len(parsed_moves) > MAX_BATCH_MOVES:
+        return error_response(f"At most {MAX_BATCH_MOVES} moves are allowed", 400)
+
+    board_ids = {board_id for board_id, _ in parsed_moves}
+    board_map = get_boards_with_players().in_bulk(board_ids)
+
+    as_int = wants_int_format(request)
+    results: list[dict[str, Any]] = []
+    for board_id, field in parsed_moves:
+        board = board_map.get(board_id)
+        if board is None:
+            results.append({"error": f"Board {board_id} does not exist"})
+            continue
+
+        row, col = divmod(field, 3)
+        match move_throttle.check(request.user.id, board_id, row, col):
+            case ThrottleResult.DUPLICATE:
+                results.append({"error": "Duplicate move"})
+                continue
+            case ThrottleResult.RATE_LIMITED:
+                results.append({"error": TOO_MANY_MOVES_MESSAGE})
+                continue
+
+        try:
+            actions.play_move(board, request.user, row, col)  # type: ignore
+        except Exception as e:
+            move_throttle.forget_move(request.user.id, board_id, row, col)
+            results.append({"error": str(e)})
+            continue
+
+        results.append(serialize_board(board, as_int))
+
+    return json_response(results)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TictactoeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tictactoe'
+
+    def ready(self) -> None:
+        # Connects the signals that keep the cached boards up to date
+        from . import board_cache  # noqa: F401
@@ -0,0 +1,122 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Board
+from .routers import use_primary
+
+KEY_PREFIX = "tictactoe:board:"
+
+
+class BoardCache:
+    """Keeps the boards that are being played, so polling them needs no queries.
+
+    The database is still the source of truth: boards are loaded from the primary
+    database on a miss, and the code that plays a move must write the new version
+    through with `put`. A board is only replaced by one with at least as many moves, so
+    a request that read the board before a move cannot write an older version back.
+    Code that changes a board without playing a move must `invalidate` it instead.
+    Boards saved with `Board.save()` or deleted are dropped from the cache, and every
+    board is loaded again after TICTACTOE_BOARD_CACHE_TTL seconds, so an update that is
+    lost anyway is only served for a while.
+
+    By default boards are kept in the memory of the process, with the least recently
+    used ones evicted after TICTACTOE_BOARD_CACHE_SIZE boards, and a size of 0 disables
+    the cache. That is only correct if a single process serves all the requests of a
+    board. With several processes, set
+    TICTACTOE_BOARD_CACHE to the alias of a shared cache (e.g. Redis) in CACHES. The
+    move count is not compared atomically there, so the TTL bounds the staleness of
+    concurrent writes.
+
+    The boards returned by the cache are shared between requests, so they must not be
+    modified.
+    """
+
+    clock: Callable[[], float]
+    boards: OrderedDict[int, tuple[Board, float]]
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.boards = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, board_id: int) -> Board | None:
+        if alias := settings.TICTACTOE_BOARD_CACHE:
+            return caches[alias].get(f"{KEY_PREFIX}{board_id}")
+
+        with self.lock:
+            entry = self.boards.get(board_id)
+            if entry is None:
+                return None
+            board, expires_at = entry
+            if self.clock() >= expires_at:
+                del self.boards[board_id]
+                return None
+            self.boards.move_to_end(board_id)
+            return board
+
+    def get_or_load(self, board_id: int) -> Board:
+        """Returns the board, loading it from the database if it is not cached. Raises
+        Board.DoesNotExist if it does not exist.
+        """
+        board = self.get(board_id)
+        if board is None:
+            # Replicas may lag behind, and the board would be served until it expires
+            with use_primary():
+                board = Board.objects.select_related(
+                    "crosses_player", "noughts_player"
+                ).get(pk=board_id)
+            self.put(board)
+        return board
+
+    def put(self, board: Board) -> None:
+        ttl = settings.TICTACTOE_BOARD_CACHE_TTL
+        if alias := settings.TICTACTOE_BOARD_CACHE:
+            cache, key = caches[alias], f"{KEY_PREFIX}{board.id}"
+            cached_board = cache.get(key)
+            if cached_board is None or cached_board.move_count <= board.move_count:
+                cache.set(key, board, ttl)
+            return
+
+        if settings.TICTACTOE_BOARD_CACHE_SIZE <= 0:
+            return
+
+        # Callers may keep modifying their board, so a copy is kept
+        board = copy.copy(board)
+        with self.lock:
+            entry = self.boards.get(board.id)
+            if entry is not None and entry[0].move_count > board.move_count:
+                return
+            self.boards[board.id] = (board, self.clock() + ttl)
+            self.boards.move_to_end(board.id)
+            if len(self.boards) > settings.TICTACTOE_BOARD_CACHE_SIZE:
+                self.boards.popitem(last=False)
+
+    def invalidate(self, board_id: int) -> None:
+        if alias := settings.TICTACTOE_BOARD_CACHE:
+            caches[alias].delete(f"{KEY_PREFIX}{board_id}")
+            return
+
+        with self.lock:
+            self.boards.pop(board_id, None)
+
+    def clear(self) -> None:
+        """Drops the boards kept in the memory of the process."""
+        with self.lock:
+            self.boards.clear()
+
+
+board_cache = BoardCache()
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def invalidate_board(sender: type[Board], instance: Board, **kwargs: object) -> None:
+    board_cache.invalidate(instance.id)
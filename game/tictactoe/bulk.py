@@ -0,0 +1,56 @@
+import gzip
+import itertools
+from typing import IO, Iterable, cast
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .models import Board
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def bulk_create_boards(
+    boards: Iterable[Board], batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """Inserts the given boards in batches inside a single transaction.
+
+    The boards are consumed lazily, so generators can be used to create very large
+    amounts of boards without keeping all of them in memory at once.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"Invalid batch size {batch_size}")
+
+    created_count = 0
+    board_iterator = iter(boards)
+
+    with transaction.atomic():
+        while batch := list(itertools.islice(board_iterator, batch_size)):
+            Board.objects.bulk_create(batch, batch_size=batch_size)
+            created_count += len(batch)
+
+    return created_count
+
+
+def create_boards(
+    count: int,
+    crosses_player: User | None = None,
+    noughts_player: User | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Creates `count` empty boards with the given players already assigned."""
+    return bulk_create_boards(
+        (
+            Board(crosses_player=crosses_player, noughts_player=noughts_player)
+            for _ in range(count)
+        ),
+        batch_size,
+    )
+
+
+def open_text_file(path: str, mode: str = "r") -> IO[str]:
+    """Opens a text file for the exports, compressed with gzip if it ends with .gz."""
+    if path.endswith(".gz"):
+        # Text modes always return a text wrapper, but gzip.open is not typed that way
+        return cast(IO[str], gzip.open(path, mode + "t", encoding="utf-8"))
+    return open(path, mode, encoding="utf-8")
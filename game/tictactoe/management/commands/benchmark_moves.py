@@ -0,0 +1,112 @@
+import threading
+import time
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import OperationalError, connections
+
+from ...bulk import create_boards
+from ...game import Game
+from ...models import Board, FieldState
+from ...routers import use_replicas
+
+# Moves of a game that ends with a tie, as (row, col) positions
+TIE_MOVES = [(0, 0), (0, 1), (0, 2), (1, 1), (1, 0), (1, 2), (2, 1), (2, 0), (2, 2)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the throughput of concurrent moves and polls against the configured "
+        "database. Run it with different settings profiles to compare them"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--boards-per-writer", type=int, default=20)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        crosses_player, _ = User.objects.get_or_create(username="benchmark-crosses")
+        noughts_player, _ = User.objects.get_or_create(username="benchmark-noughts")
+        create_boards(
+            options["writers"] * options["boards_per_writer"],
+            crosses_player=crosses_player,
+            noughts_player=noughts_player,
+        )
+        board_ids = list(
+            Board.objects.filter(crosses_player=crosses_player)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        stats = {"moves": 0, "polls": 0, "errors": 0}
+        stats_lock = threading.Lock()
+        writers_done = threading.Event()
+
+        def count(key: str) -> None:
+            with stats_lock:
+                stats[key] += 1
+
+        def write(board_ids: list[int]) -> None:
+            try:
+                for board_id in board_ids:
+                    play_tie(board_id)
+            finally:
+                connections.close_all()
+
+        def play_tie(board_id: int) -> None:
+            for i, (row, col) in enumerate(TIE_MOVES):
+                field_state = FieldState.X if i % 2 == 0 else FieldState.O
+                # Failed moves are retried, like a player would do
+                while True:
+                    try:
+                        board = Board.objects.get(pk=board_id)
+                        Game(board).occupy_field(row, col, field_state)
+                        board.save()
+                        count("moves")
+                        break
+                    except OperationalError:
+                        count("errors")
+
+        def read() -> None:
+            try:
+                # Polls read from the replicas, like GET requests do
+                with use_replicas():
+                    while not writers_done.is_set():
+                        for board_id in board_ids:
+                            try:
+                                Board.objects.get(pk=board_id)
+                                count("polls")
+                            except OperationalError:
+                                count("errors")
+            finally:
+                connections.close_all()
+
+        chunk_size = options["boards_per_writer"]
+        writers = [
+            threading.Thread(target=write, args=(board_ids[i : i + chunk_size],))
+            for i in range(0, len(board_ids), chunk_size)
+        ]
+        readers = [threading.Thread(target=read) for _ in range(options["readers"])]
+
+        start_time = time.perf_counter()
+        for thread in writers + readers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        writers_done.set()
+        for thread in readers:
+            thread.join()
+        elapsed_time = time.perf_counter() - start_time
+
+        Board.objects.filter(pk__in=board_ids).delete()
+
+        self.stdout.write(
+            f"Database: {settings.DATABASES['default']['NAME']}\n"
+            f"Elapsed time: {elapsed_time:.2f} s\n"
+            f"Moves: {stats['moves']} ({stats['moves'] / elapsed_time:.0f}/s)\n"
+            f"Polls: {stats['polls']} ({stats['polls'] / elapsed_time:.0f}/s)\n"
+            f"Errors: {stats['errors']}"
+        )
@@ -0,0 +1,88 @@
+import json
+import os
+import subprocess
+import sys
+from statistics import mean
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.urls import reverse
+
+from ...models import Board
+
+# Runs in a fresh interpreter, so the startup of Django is measured from scratch
+WORKER_SCRIPT = """
+import json, sys, time
+
+start_time = time.perf_counter()
+import django
+django.setup()
+from django.test import Client
+client = Client(SERVER_NAME="localhost")
+setup_time = time.perf_counter() - start_time
+
+request_times = {}
+for url in sys.argv[2:]:
+    client.get(url)  # Warm up caches like the URL resolver
+    start_time = time.perf_counter()
+    for _ in range(int(sys.argv[1])):
+        client.get(url)
+    request_times[url] = (time.perf_counter() - start_time) / int(sys.argv[1])
+
+print(json.dumps({"setup_time": setup_time, "request_times": request_times}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the startup time and the per-request overhead of the given settings "
+        "modules, by default the regular settings and the worker settings"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "settings_modules",
+            nargs="*",
+            default=["game.settings", "game.settings_worker"],
+        )
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--requests", type=int, default=500)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        board = Board.objects.create()
+        urls = [
+            reverse("tictactoe:board_detail", args=(board.id,)),
+            reverse("tictactoe:api_board", args=(board.id,)),
+        ]
+
+        try:
+            for settings_module in options["settings_modules"]:
+                results = [
+                    self.run_worker(settings_module, options["requests"], urls)
+                    for _ in range(options["runs"])
+                ]
+
+                self.stdout.write(f"{settings_module}:")
+                setup_time = mean(result["setup_time"] for result in results)
+                self.stdout.write(f"  Startup: {setup_time * 1e3:.1f} ms")
+                for url in urls:
+                    request_time = mean(
+                        result["request_times"][url] for result in results
+                    )
+                    self.stdout.write(f"  GET {url}: {request_time * 1e6:.0f} us")
+        finally:
+            board.delete()
+
+    def run_worker(
+        self, settings_module: str, request_count: int, urls: list[str]
+    ) -> dict[str, Any]:
+        output = subprocess.run(
+            [sys.executable, "-c", WORKER_SCRIPT, str(request_count), *urls],
+            env=os.environ | {"DJANGO_SETTINGS_MODULE": settings_module},
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        return json.loads(output)
@@ -0,0 +1,38 @@
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from ...bulk import DEFAULT_BATCH_SIZE, create_boards
+
+
+class Command(BaseCommand):
+    help = "Creates many boards at once, optionally with pre-assigned players"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("count", type=int, help="Number of boards to create")
+        parser.add_argument("--crosses", help="Username of the crosses player")
+        parser.add_argument("--noughts", help="Username of the noughts player")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["count"] < 0:
+            raise CommandError(f"Invalid board count {options['count']}")
+
+        created_count = create_boards(
+            options["count"],
+            crosses_player=self.get_user(options["crosses"]),
+            noughts_player=self.get_user(options["noughts"]),
+            batch_size=options["batch_size"],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Created {created_count} boards"))
+
+    def get_user(self, username: str | None) -> User | None:
+        if username is None:
+            return None
+
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"User {username} does not exist")
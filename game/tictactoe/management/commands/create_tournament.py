@@ -0,0 +1,42 @@
+from typing import Any
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from ...models import Tournament
+from ...tournament import start_tournament
+
+
+class Command(BaseCommand):
+    help = "Creates a tournament with the given players and schedules its first round"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("name")
+        parser.add_argument("usernames", nargs="+", help="Usernames of the players")
+        parser.add_argument(
+            "--kind",
+            choices=[kind.name.lower() for kind in Tournament.Kind],
+            default=Tournament.Kind.SINGLE_ELIMINATION.name.lower(),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        usernames = set(options["usernames"])
+        players = User.objects.filter(username__in=usernames)
+        if len(players) != len(usernames):
+            missing = usernames - {player.username for player in players}
+            raise CommandError(f"Users {', '.join(sorted(missing))} do not exist")
+
+        with transaction.atomic():
+            tournament = Tournament.objects.create(
+                name=options["name"], kind=Tournament.Kind[options["kind"].upper()]
+            )
+            tournament.players.set(players)
+            try:
+                start_tournament(tournament)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Created tournament {tournament.id}: {tournament}")
+        )
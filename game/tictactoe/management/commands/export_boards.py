@@ -0,0 +1,56 @@
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from ...bulk import open_text_file
+from ...models import Board
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports all boards as newline-delimited JSON, one board per line. Boards are "
+        "streamed from the database in chunks, so any amount of them can be exported"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "output",
+            nargs="?",
+            default="-",
+            help="Output file, compressed with gzip if it ends with .gz (default stdout)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["output"] == "-":
+            exported_count = self.export(self.stdout, options["chunk_size"])
+        else:
+            with open_text_file(options["output"], "w") as output:
+                exported_count = self.export(output, options["chunk_size"])
+
+        self.stderr.write(self.style.SUCCESS(f"Exported {exported_count} boards"))
+
+    def export(self, output: Any, chunk_size: int) -> int:
+        boards = (
+            Board.objects.order_by("id")
+            .values_list(
+                "id", "crosses_player__username", "noughts_player__username", "state"
+            )
+            .iterator(chunk_size=chunk_size)
+        )
+
+        exported_count = 0
+        for board_id, crosses, noughts, state in boards:
+            line = json.dumps(
+                {
+                    "id": board_id,
+                    "crosses": crosses,
+                    "noughts": noughts,
+                    "state": state,
+                },
+                separators=(",", ":"),
+            )
+            output.write(line + "\n")
+            exported_count += 1
+        return exported_count
@@ -0,0 +1,105 @@
+import itertools
+import json
+from typing import IO, Any, Iterator
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+
+from ...bulk import DEFAULT_BATCH_SIZE, bulk_create_boards, open_text_file
+from ...models import Board, FieldState
+
+FIELD_STATE_VALUES = {field_state.value for field_state in FieldState}
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports boards exported with export_boards. The file is read and inserted in "
+        "batches within a single transaction, so any amount of boards can be imported"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("input", help="File to import, may be compressed with gzip")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--new-ids",
+            action="store_true",
+            help="Let the database assign new ids instead of keeping the exported ones",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["batch_size"] <= 0:
+            raise CommandError(f"Invalid batch size {options['batch_size']}")
+
+        try:
+            with open_text_file(options["input"]) as input_file, transaction.atomic():
+                imported_count = bulk_create_boards(
+                    self.read_boards(
+                        input_file, options["batch_size"], options["new_ids"]
+                    ),
+                    options["batch_size"],
+                )
+
+                if not options["new_ids"]:
+                    # Inserting explicit ids does not move the id sequences of
+                    # databases like PostgreSQL, so new boards would get taken ids
+                    with connection.cursor() as cursor:
+                        for sql in connection.ops.sequence_reset_sql(
+                            no_style(), [Board]
+                        ):
+                            cursor.execute(sql)
+        except IntegrityError as e:
+            raise CommandError(
+                f"Boards could not be imported ({e}), use --new-ids if their ids are "
+                "already taken"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported_count} boards"))
+
+    def read_boards(
+        self, input_file: IO[str], batch_size: int, new_ids: bool
+    ) -> Iterator[Board]:
+        lines = (line for line in input_file if line.strip())
+        while batch := list(itertools.islice(lines, batch_size)):
+            try:
+                rows = [json.loads(line) for line in batch]
+                boards = [
+                    (row["id"], row["crosses"], row["noughts"], row["state"])
+                    for row in rows
+                ]
+                # Players are looked up once per batch instead of once per board
+                usernames = {
+                    username
+                    for _, crosses, noughts, _ in boards
+                    for username in (crosses, noughts)
+                }
+            except (ValueError, KeyError, TypeError) as e:
+                raise CommandError(f"Invalid board: {e!r}")
+
+            for _, _, _, state in boards:
+                if not (
+                    isinstance(state, str)
+                    and len(state) == 9
+                    and set(state) <= FIELD_STATE_VALUES
+                ):
+                    raise CommandError(f"Invalid board state {state!r}")
+
+            usernames.discard(None)
+            user_ids = dict(
+                User.objects.filter(username__in=usernames).values_list(
+                    "username", "id"
+                )
+            )
+            if missing_usernames := usernames - user_ids.keys():
+                raise CommandError(
+                    f"Users {', '.join(sorted(missing_usernames))} do not exist"
+                )
+
+            for board_id, crosses, noughts, state in boards:
+                yield Board(
+                    id=None if new_ids else board_id,
+                    crosses_player_id=user_ids.get(crosses),
+                    noughts_player_id=user_ids.get(noughts),
+                    state=state,
+                )
@@ -0,0 +1,56 @@
+from typing import Any, Iterator
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from ...bulk import DEFAULT_BATCH_SIZE, bulk_create_boards
+from ...models import Board
+
+
+class Command(BaseCommand):
+    help = "Seeds the database with many users and boards for load testing"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--boards-per-user", type=int, default=100)
+        parser.add_argument("--prefix", default="seed", help="Prefix of the usernames")
+        parser.add_argument("--password", default="seed")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["users"] < 2:
+            raise CommandError("At least two users are needed to seed boards")
+
+        # Hashing a password is slow on purpose, so all users share the same hash
+        password = make_password(options["password"])
+        usernames = [f"{options['prefix']}{i}" for i in range(options["users"])]
+
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [User(username=username, password=password) for username in usernames],
+                batch_size=options["batch_size"],
+                ignore_conflicts=True,
+            )
+            users = list(User.objects.filter(username__in=usernames).order_by("id"))
+            created_count = bulk_create_boards(
+                self.generate_boards(users, options["boards_per_user"]),
+                options["batch_size"],
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Seeded {len(users)} users and {created_count} boards")
+        )
+
+    def generate_boards(
+        self, users: list[User], boards_per_user: int
+    ) -> Iterator[Board]:
+        # Every user plays crosses against the next user in the list, so each of them
+        # ends up taking part in 2 * boards_per_user boards
+        for i, crosses_player in enumerate(users):
+            noughts_player = users[(i + 1) % len(users)]
+            for _ in range(boards_per_user):
+                yield Board(
+                    crosses_player=crosses_player, noughts_player=noughts_player
+                )
@@ -0,0 +1,29 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the default SQLite database into the SQLite replicas. It is meant for "
+        "testing the replica routing locally, real replicas are kept in sync by the "
+        "database server"
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != "sqlite":
+            raise CommandError("Only SQLite databases can be synchronized")
+
+        primary.ensure_connection()
+        for alias in settings.TICTACTOE_REPLICA_DATABASES:
+            replica = connections[alias]
+            if str(primary.settings_dict["NAME"]) in str(replica.settings_dict["NAME"]):
+                # Read-only connections to the primary file are always up to date
+                continue
+
+            replica.ensure_connection()
+            primary.connection.backup(replica.connection)
+            self.stdout.write(self.style.SUCCESS(f"Synchronized replica {alias}"))
@@ -0,0 +1,47 @@
+from functools import cached_property
+from typing import Callable
+
+from django.http import HttpRequest, HttpResponse
+from django.urls import Resolver404, get_script_prefix, resolve, reverse
+
+# The polled view only reads public data, so it needs no sessions, users or CSRF checks
+POLLING_VIEW_NAME = "tictactoe:board_detail"
+
+
+class PollingMiddleware:
+    """Serves the requests of the polled view directly, skipping the middleware that
+    comes after it in MIDDLEWARE (sessions, authentication, CSRF, messages...).
+
+    The board detail is requested by every client once per second, so it must be as
+    cheap as possible. Skipping the middleware also guarantees that no session or user
+    is ever loaded for these requests.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    @cached_property
+    def polling_path_prefix(self) -> str:
+        # The reversed URL starts with the script prefix, which path_info does not have
+        url = reverse(POLLING_VIEW_NAME, args=(0,))
+        return "/" + url.removeprefix(get_script_prefix()).removesuffix("0/")
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if request.method == "GET" and request.path_info.startswith(
+            self.polling_path_prefix
+        ):
+            try:
+                resolver_match = resolve(request.path_info)
+            except Resolver404:
+                # Let the rest of the middleware handle it, e.g. to append a slash
+                return self.get_response(request)
+
+            if resolver_match.view_name == POLLING_VIEW_NAME:
+                request.resolver_match = resolver_match
+                response = resolver_match.func(
+                    request, *resolver_match.args, **resolver_match.kwargs
+                )
+                response.headers.setdefault("X-Frame-Options", "DENY")
+                return response
+
+        return self.get_response(request)
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tictactoe", "0008_alter_board_noughts_player_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tournament",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("RR", "Round-robin"), ("SE", "Single elimination")],
+                        max_length=2,
+                    ),
+                ),
+                ("current_round", models.PositiveIntegerField(default=0)),
+                ("pending_matches", models.PositiveIntegerField(default=0)),
+                ("is_finished", models.BooleanField(default=False)),
+                (
+                    "players",
+                    models.ManyToManyField(
+                        related_name="tournaments", to=settings.AUTH_USER_MODEL
+                    ),
+                ),
+                (
+                    "winner",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="won_tournaments",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Match",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("round", models.PositiveIntegerField()),
+                ("index", models.PositiveIntegerField()),
+                ("is_finished", models.BooleanField(default=False)),
+                (
+                    "board",
+                    models.OneToOneField(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="match",
+                        to="tictactoe.board",
+                    ),
+                ),
+                (
+                    "winner",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="won_matches",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="matches",
+                        to="tictactoe.tournament",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("tournament", "round", "index"),
+                        name="unique_match_position",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -25,6 +25,10 @@ class Board(models.Model):
             f"X = {self.crosses_player} O = {self.noughts_player} status = {self.state}"
         )
 
+    @property
+    def move_count(self) -> int:
+        return len(self.state) - self.state.count(FieldState.EMPTY.value)
+
     def get_field_state(self, row: int, col: int) -> FieldState:
         if 0 <= row < 3 and 0 <= col < 3:
             return FieldState(self.state[row * 3 + col])
@@ -38,3 +42,52 @@ class Board(models.Model):
             self.state = "".join(list_state)
         else:
             raise ValueError(f"Invalid row or col {row, col}")
+
+
+class Tournament(models.Model):
+    class Kind(models.TextChoices):
+        ROUND_ROBIN = "RR", "Round-robin"
+        SINGLE_ELIMINATION = "SE", "Single elimination"
+
+    id: int
+    name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=2, choices=Kind.choices)
+    players = models.ManyToManyField(User, related_name="tournaments")
+    current_round = models.PositiveIntegerField(default=0)
+    # Number of matches of the current round that are not finished yet. When it drops
+    # to zero the next round is scheduled
+    pending_matches = models.PositiveIntegerField(default=0)
+    is_finished = models.BooleanField(default=False)
+    winner = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="won_tournaments"
+    )
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.get_kind_display()})"
+
+
+class Match(models.Model):
+    id: int
+    tournament = models.ForeignKey(
+        Tournament, on_delete=models.CASCADE, related_name="matches"
+    )
+    round = models.PositiveIntegerField()
+    # Position of the match within its round, used to pair the winners in brackets
+    index = models.PositiveIntegerField()
+    board = models.OneToOneField(
+        Board, on_delete=models.SET_NULL, null=True, related_name="match"
+    )
+    is_finished = models.BooleanField(default=False)
+    winner = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="won_matches"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tournament", "round", "index"], name="unique_match_position"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tournament} round = {self.round} match = {self.index}"
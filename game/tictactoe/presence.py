@@ -0,0 +1,119 @@
+import hashlib
+import time
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.http import HttpRequest
+
+KEY_PREFIX = "tictactoe:presence:"
+
+
+class PresenceTracker:
+    """Keeps track of the clients that are viewing each board.
+
+    Time is split in slots of half TICTACTOE_PRESENCE_TTL seconds. The first poll of
+    each viewer in a slot adds one to the viewer count of the board for that slot, and
+    the first viewer of each board adds the board to the index of the slot, which is
+    used to list the hottest boards. A board shows the highest count of the current
+    and the previous slot, so viewers are forgotten at most TICTACTOE_PRESENCE_TTL
+    seconds after their last poll. Nothing is written to the database.
+
+    Entries are only written with `add` and `incr`, which are atomic in shared caches
+    like Redis, so concurrent viewers never overwrite each other's updates.
+
+    With the default local-memory cache each process only sees its own viewers. Point
+    TICTACTOE_PRESENCE_CACHE to a shared cache (e.g. Redis) to count all of them.
+    """
+
+    clock: Callable[[], float]
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        # Wall time, unlike monotonic time, can be compared between processes
+        self.clock = clock
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[settings.TICTACTOE_PRESENCE_CACHE]
+
+    @property
+    def ttl(self) -> float:
+        return settings.TICTACTOE_PRESENCE_TTL
+
+    def get_slot(self) -> int:
+        return int(self.clock() // (self.ttl / 2))
+
+    def touch(self, board_id: int, viewer: str) -> None:
+        # Entries live for two slots, the one they belong to and the next one
+        cache, slot, ttl = self.cache, self.get_slot(), self.ttl
+
+        # Clients poll much more often than once per slot, so most polls stop here
+        if not cache.add(f"{KEY_PREFIX}viewer:{slot}:{board_id}:{viewer}", True, ttl):
+            return
+
+        if self.increment(f"{KEY_PREFIX}count:{slot}:{board_id}") == 1:
+            # Every board is added once per slot, each one to its own index position
+            length_key = f"{KEY_PREFIX}index:{slot}"
+            position = self.increment(length_key)
+            cache.set(f"{length_key}:{position}", board_id, ttl)
+
+    def increment(self, key: str) -> int:
+        """Increments the counter atomically, creating it if it does not exist."""
+        self.cache.add(key, 0, self.ttl)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # The counter was evicted right after it was added
+            self.cache.set(key, 1, self.ttl)
+            return 1
+
+    def count(self, board_id: int) -> int:
+        return self.count_many([board_id])[board_id]
+
+    def count_many(self, board_ids: Iterable[int]) -> dict[int, int]:
+        slot = self.get_slot()
+        keys = {
+            board_id: [f"{KEY_PREFIX}count:{s}:{board_id}" for s in (slot - 1, slot)]
+            for board_id in board_ids
+        }
+        counts = self.cache.get_many(
+            [key for key_list in keys.values() for key in key_list]
+        )
+        return {
+            board_id: max(counts.get(key, 0) for key in key_list)
+            for board_id, key_list in keys.items()
+        }
+
+    def hot_boards(self, limit: int = 100) -> list[tuple[int, int]]:
+        """Returns the ids and viewer counts of the boards with most viewers."""
+        slot = self.get_slot()
+        board_ids: set[int] = set()
+        for s in (slot - 1, slot):
+            length_key = f"{KEY_PREFIX}index:{s}"
+            length = self.cache.get(length_key, 0)
+            board_ids.update(
+                self.cache.get_many(
+                    [f"{length_key}:{position}" for position in range(1, length + 1)]
+                ).values()
+            )
+
+        counts = [
+            (board_id, count)
+            for board_id, count in self.count_many(board_ids).items()
+            if count > 0
+        ]
+        counts.sort(key=lambda board_count: board_count[1], reverse=True)
+        return counts[:limit]
+
+
+def get_viewer_id(request: HttpRequest) -> str:
+    """Identifies the client by its session cookie, or by its address and browser if it
+    has no session. The result is hashed so session keys are never stored.
+    """
+    viewer = request.COOKIES.get(settings.SESSION_COOKIE_NAME) or (
+        f"{request.META.get('REMOTE_ADDR')} {request.META.get('HTTP_USER_AGENT')}"
+    )
+    return hashlib.blake2b(viewer.encode(), digest_size=8).hexdigest()
+
+
+tracker = PresenceTracker()
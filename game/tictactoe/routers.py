@@ -0,0 +1,95 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, HttpResponse
+
+# Name of the cookie that keeps the reads of a client on the primary database for a
+# while after it has written something, so it always sees its own writes
+PIN_COOKIE_NAME = "tictactoe_primary"
+
+_read_from_replicas: ContextVar[bool] = ContextVar(
+    "read_from_replicas", default=False
+)
+
+
+@contextmanager
+def use_replicas() -> Iterator[None]:
+    """Sends the reads inside the block to the replicas, if there are any."""
+    token = _read_from_replicas.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replicas.reset(token)
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """Sends all the reads inside the block to the primary database, even inside
+    `use_replicas`.
+    """
+    token = _read_from_replicas.set(False)
+    try:
+        yield
+    finally:
+        _read_from_replicas.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Sends writes to the primary database, and reads inside `use_replicas` to the
+    replicas in TICTACTOE_REPLICA_DATABASES.
+
+    Everything else reads from the primary: management commands, requests that may
+    write and reads inside a transaction, which must see the writes made before them.
+    """
+
+    def db_for_read(self, model: Any, **hints: Any) -> str:
+        replicas = settings.TICTACTOE_REPLICA_DATABASES
+        if (
+            not replicas
+            or not _read_from_replicas.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model: Any, **hints: Any) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool:
+        # All databases contain the same data
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> bool:
+        return True
+
+
+class PrimaryReplicaMiddleware:
+    """Reads from the replicas in safe requests, like GET requests. Requests that may
+    write, and the requests that come shortly after them from the same client, use the
+    primary database.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        is_writing = request.method not in ("GET", "HEAD", "OPTIONS", "TRACE")
+        if not is_writing and PIN_COOKIE_NAME not in request.COOKIES:
+            with use_replicas():
+                return self.get_response(request)
+
+        response = self.get_response(request)
+
+        if is_writing:
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                "1",
+                max_age=settings.TICTACTOE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
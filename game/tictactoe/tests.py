@@ -1,15 +1,57 @@
 import enum
+import json
+import random
+import tempfile
+import threading
+import time
 
-from typing import cast
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable, Iterator, cast
+from unittest import mock
 
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.http import HttpResponseRedirect
-from django.test import TestCase
-from django.urls import reverse
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseRedirect
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse, set_script_prefix
 
+from game import settings_worker as worker_settings
+
+from . import actions
+from .analysis import ROTATION, SYMMETRIES, analyse, canonicalize, solve
+from .board_cache import BoardCache, board_cache
+from .bulk import create_boards
 from .game import Game, GameState
-from .models import Board, FieldState
+from .models import Board, FieldState, Match, Tournament
+from .presence import PresenceTracker
+from .routers import (
+    PIN_COOKIE_NAME,
+    PrimaryReplicaMiddleware,
+    PrimaryReplicaRouter,
+    use_primary,
+    use_replicas,
+)
+from .throttle import MoveThrottle, ThrottleResult, move_throttle
+from .tournament import (
+    bracket_pairings,
+    on_board_finished,
+    round_robin_pairings,
+    start_tournament,
+)
 
 
 class StatusCode(enum.Enum):
@@ -67,6 +109,12 @@ class TicTacToeViewTest(TestCase):
         cls.board4 = Board.objects.create(crosses_player=cls.user2, noughts_player=None)
         cls.board5 = Board.objects.create(crosses_player=cls.user3, noughts_player=None)
 
+    def setUp(self) -> None:
+        # Ids are reused between tests, so boards and moves of previous tests could be
+        # cached or throttled
+        board_cache.clear()
+        move_throttle.clear()
+
 
 class UserBoardsTest(TicTacToeViewTest):
     def test_non_logged_users_see_no_boards(self) -> None:
@@ -109,6 +157,132 @@ class BoardViewTest(TicTacToeViewTest):
         self.assertTrue(len(response.context["field_infos"]) > 0)
 
 
+class BoardCacheTest(TicTacToeViewTest):
+    def poll(self, board_id: int) -> Board:
+        response = self.client.get(reverse("tictactoe:board_detail", args=(board_id,)))
+        return response.context["board"]
+
+    def test_polling_cached_board_does_not_query_database(self) -> None:
+        self.poll(self.board1.id)
+        with self.assertNumQueries(0):
+            board = self.poll(self.board1.id)
+        self.assertEqual(board, self.board1)
+
+    def test_moves_are_written_through(self) -> None:
+        self.poll(self.board1.id)
+
+        self.client.login(username=self.user1.username, password=self.password)
+        self.client.post(
+            reverse("tictactoe:set_field_state", args=(self.board1.id, 1, 1))
+        )
+
+        with self.assertNumQueries(0):
+            board = self.poll(self.board1.id)
+        self.assertEqual(board.state, "    X    ")
+        self.assertEqual(board.crosses_player, self.user1)
+
+    def test_joins_reload_board(self) -> None:
+        self.poll(self.board4.id)
+
+        self.client.login(username=self.user1.username, password=self.password)
+        self.client.post(reverse("tictactoe:join_board", args=(self.board4.id,)))
+
+        self.client.logout()
+        with self.assertNumQueries(1):
+            board = self.poll(self.board4.id)
+        self.assertEqual(board.noughts_player, self.user1)
+
+    def test_join_does_not_overwrite_later_move(self) -> None:
+        # The join reads the board before the move is played, and finishes after it
+        board = Board.objects.select_related("crosses_player").get(pk=self.board4.id)
+        self.client.login(username=self.user2.username, password=self.password)
+        self.client.post(
+            reverse("tictactoe:set_field_state", args=(self.board4.id, 1, 1))
+        )
+        actions.join_board(board, self.user1)
+
+        self.assertEqual(self.poll(self.board4.id).state, "    X    ")
+
+    def test_older_boards_do_not_replace_newer_ones(self) -> None:
+        old_board = Board.objects.get(pk=self.board1.id)
+        new_board = Board.objects.get(pk=self.board1.id)
+        new_board.state = "    X    "
+        board_cache.put(new_board)
+        board_cache.put(old_board)
+        self.assertEqual(self.poll(self.board1.id).state, "    X    ")
+
+    def test_boards_expire_after_ttl(self) -> None:
+        now = 0.0
+        cache = BoardCache(clock=lambda: now)
+        cache.get_or_load(self.board1.id)
+        self.assertIsNotNone(cache.get(self.board1.id))
+
+        now += settings.TICTACTOE_BOARD_CACHE_TTL
+        self.assertIsNone(cache.get(self.board1.id))
+        self.assertEqual(cache.boards, {})
+
+    def test_saved_and_deleted_boards_are_invalidated(self) -> None:
+        self.poll(self.board1.id)
+        board = Board.objects.get(pk=self.board1.id)
+        board.state = "X        "
+        board.save()
+        self.assertEqual(self.poll(self.board1.id).state, "X        ")
+
+        board.delete()
+        self.assertIsNone(board_cache.get(self.board1.id))
+
+    @override_settings(TICTACTOE_BOARD_CACHE_SIZE=2)
+    def test_least_recently_used_boards_are_evicted(self) -> None:
+        for board in (self.board1, self.board2, self.board1, self.board3):
+            board_cache.get_or_load(board.id)
+        self.assertEqual(list(board_cache.boards), [self.board1.id, self.board3.id])
+
+    @override_settings(TICTACTOE_BOARD_CACHE="default")
+    def test_boards_can_be_kept_in_a_shared_cache(self) -> None:
+        cache.clear()
+        board_cache.get_or_load(self.board1.id)
+        self.assertEqual(board_cache.boards, {})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(board_cache.get_or_load(self.board1.id), self.board1)
+
+
+class BoardDetailViewTest(TicTacToeViewTest):
+    def test_polling_does_not_load_session_nor_user(self) -> None:
+        self.client.login(username=self.user1.username, password=self.password)
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("tictactoe:board_detail", args=(self.board1.id,))
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["board"], self.board1)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertFalse(hasattr(response.wsgi_request, "user"))
+
+    def test_polling_under_script_prefix_does_not_load_session(self) -> None:
+        self.client.login(username=self.user1.username, password=self.password)
+        path = reverse("tictactoe:board_detail", args=(self.board1.id,))
+
+        # Set by the WSGI handler from SCRIPT_NAME, but not by the test client
+        set_script_prefix("/game/")
+        self.addCleanup(set_script_prefix, "/")
+        with self.assertNumQueries(1):
+            response = self.client.get(path, SCRIPT_NAME="/game")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+
+    def test_polling_non_existing_board_returns_404(self) -> None:
+        response = self.client.get(reverse("tictactoe:board_detail", args=(0,)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_polling_without_trailing_slash_redirects(self) -> None:
+        url = reverse("tictactoe:board_detail", args=(self.board1.id,))
+        response = self.client.get(url.removesuffix("/"))
+        self.assertRedirects(response, url, status_code=301)
+
+
 class JoinBoardTest(TicTacToeViewTest):
     def test_non_logged_users_cannot_join_board(self) -> None:
         response = self.client.post(
@@ -163,6 +337,30 @@ class SetFieldStateViewTest(TicTacToeViewTest):
         assert user is not None
         modify_board(user, 2, 2, FieldState.O)
 
+    def test_duplicate_moves_do_not_reach_the_board(self) -> None:
+        self.client.login(username=self.user1.username, password=self.password)
+        url = reverse("tictactoe:set_field_state", args=(self.board_id, 0, 0))
+        self.client.post(url)
+
+        # Only the session and the user are loaded
+        with self.assertNumQueries(2):
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, 204)
+
+    def test_failed_moves_can_be_retried(self) -> None:
+        # Noughts cannot move first
+        self.client.login(username=self.user2.username, password=self.password)
+        url = reverse("tictactoe:set_field_state", args=(self.board_id, 0, 0))
+        for _ in range(2):
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, StatusCode.FORBIDDEN.value)
+
+    def test_moves_on_non_existing_boards_return_404(self) -> None:
+        self.client.login(username=self.user1.username, password=self.password)
+        url = reverse("tictactoe:set_field_state", args=(0, 0, 0))
+        for _ in range(2):
+            self.assertEqual(self.client.post(url).status_code, 404)
+
     def test_logged_user_cannot_modify_other_boards(self):
         board = Board.objects.get(pk=self.board_id)
         self.client.login(username=self.user3.username, password=self.password)
@@ -191,6 +389,597 @@ class CreateBoardViewTest(TicTacToeViewTest):
         self.assertEqual(response.context["board"].crosses_player, self.user1)
 
 
+class ViewPerformanceTest(TestCase):
+    """Checks the number of queries and the time of every view with users that have
+    thousands of boards, so N+1 queries and slow listings are caught by the tests.
+
+    The time budgets are several times the usual times, so they only fail on real
+    regressions and not on slow machines.
+    """
+
+    boards_per_user = 2000
+    listing_budget = 2.0
+    request_budget = 0.2
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.password = "test"
+        cls.user1 = User.objects.create_user(username="test1", password=cls.password)
+        cls.user2 = User.objects.create_user(username="test2", password=cls.password)
+        cls.user3 = User.objects.create_user(username="test3", password=cls.password)
+
+        create_boards(cls.boards_per_user, cls.user1, cls.user2)
+        create_boards(cls.boards_per_user, cls.user2, cls.user1)
+        create_boards(cls.boards_per_user, cls.user3)
+        create_boards(cls.boards_per_user, cls.user2, cls.user3)
+        cls.board = Board.objects.filter(crosses_player=cls.user1).last()
+        cls.open_board = Board.objects.filter(noughts_player=None).last()
+
+    def setUp(self) -> None:
+        board_cache.clear()
+        move_throttle.clear()
+        self.client.login(username=self.user1.username, password=self.password)
+
+    @contextmanager
+    def assertFasterThan(self, seconds: float) -> Iterator[None]:
+        start_time = time.perf_counter()
+        yield
+        elapsed_time = time.perf_counter() - start_time
+        self.assertLess(
+            elapsed_time, seconds, f"Took {elapsed_time:.3f}s, budget is {seconds}s"
+        )
+
+    def test_user_boards(self) -> None:
+        # The session, the user and the boards with their players
+        with self.assertNumQueries(3), self.assertFasterThan(self.listing_budget):
+            response = self.client.get(reverse("tictactoe:user_boards"))
+        self.assertEqual(len(response.context["board_list"]), 2 * self.boards_per_user)
+
+    def test_open_boards(self) -> None:
+        with self.assertNumQueries(3), self.assertFasterThan(self.listing_budget):
+            response = self.client.get(reverse("tictactoe:open_boards"))
+        self.assertEqual(len(response.context["board_list"]), self.boards_per_user)
+
+    def test_board(self) -> None:
+        url = reverse("tictactoe:board", args=(self.board.id,))
+        with self.assertNumQueries(3), self.assertFasterThan(self.request_budget):
+            response = self.client.get(url)
+        self.assertNotIn("user_can_join", response.context)
+
+        # The board is cached after the first request
+        with self.assertNumQueries(2), self.assertFasterThan(self.request_budget):
+            self.client.get(url)
+
+    def test_board_detail(self) -> None:
+        url = reverse("tictactoe:board_detail", args=(self.board.id,))
+        with self.assertNumQueries(1), self.assertFasterThan(self.request_budget):
+            self.client.get(url)
+        with self.assertNumQueries(0), self.assertFasterThan(self.request_budget):
+            self.client.get(url)
+
+    def test_join_board(self) -> None:
+        # The session, the user, the board and the update of the seat
+        with self.assertNumQueries(4), self.assertFasterThan(self.request_budget):
+            response = self.client.post(
+                reverse("tictactoe:join_board", args=(self.open_board.id,))
+            )
+        self.assertEqual(response.status_code, 302)
+
+    def test_set_field_state(self) -> None:
+        # The session, the user, the board, the update of the state and the board,
+        # which is rendered from the cache
+        with self.assertNumQueries(4), self.assertFasterThan(self.request_budget):
+            response = self.client.post(
+                reverse("tictactoe:set_field_state", args=(self.board.id, 1, 1))
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_create_board(self) -> None:
+        with self.assertNumQueries(3), self.assertFasterThan(self.request_budget):
+            response = self.client.post(reverse("tictactoe:create_board"))
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(
+    INSTALLED_APPS=worker_settings.INSTALLED_APPS,
+    MIDDLEWARE=worker_settings.MIDDLEWARE,
+    TEMPLATES=worker_settings.TEMPLATES,
+    ROOT_URLCONF=worker_settings.ROOT_URLCONF,
+)
+class WorkerSettingsTest(TicTacToeViewTest):
+    def test_worker_serves_game_endpoints(self) -> None:
+        response = self.client.get(
+            reverse("tictactoe:board_detail", args=(self.board1.id,))
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(
+            reverse("tictactoe:api_board", args=(self.board1.id,))
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.client.login(username=self.user1.username, password=self.password)
+        response = self.client.post(
+            reverse("tictactoe:set_field_state", args=(self.board1.id, 1, 1))
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(
+        TICTACTOE_BOARD_CACHE_SIZE=worker_settings.TICTACTOE_BOARD_CACHE_SIZE
+    )
+    def test_worker_does_not_cache_boards_in_memory(self) -> None:
+        url = reverse("tictactoe:board_detail", args=(self.board1.id,))
+        self.client.get(url)
+        Board.objects.filter(pk=self.board1.id).update(state="    X    ")
+        self.assertEqual(self.client.get(url).context["board"].state, "    X    ")
+
+    def test_worker_does_not_serve_pages_nor_admin(self) -> None:
+        for url in ("/tictactoe/", f"/tictactoe/boards/{self.board1.id}/", "/admin/"):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 404)
+
+
+class ApiTest(TicTacToeViewTest):
+    def post_moves(self, moves: list[dict[str, int]]) -> list[dict[str, Any]]:
+        response = self.client.post(
+            reverse("tictactoe:api_moves"),
+            {"moves": moves},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_non_logged_users_cannot_list_boards(self) -> None:
+        response = self.client.get(reverse("tictactoe:api_boards"))
+        self.assertEqual(response.status_code, StatusCode.FORBIDDEN.value)
+
+    def test_clients_can_log_in_and_play_without_html(self) -> None:
+        client = Client(enforce_csrf_checks=True)
+        response = client.post(
+            reverse("tictactoe:api_login"),
+            {"username": self.user1.username, "password": self.password},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        csrf_token = response.json()["csrf_token"]
+
+        url = reverse("tictactoe:api_boards")
+        response = client.post(url)
+        self.assertEqual(response.status_code, StatusCode.FORBIDDEN.value)
+        response = client.post(url, HTTP_X_CSRFTOKEN=csrf_token)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["crosses"], self.user1.username)
+
+    def test_login_with_wrong_password_fails(self) -> None:
+        response = self.client.post(
+            reverse("tictactoe:api_login"),
+            {"username": self.user1.username, "password": "wrong"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn("_auth_user_id", self.client.session)
+
+    def test_login_only_accepts_json(self) -> None:
+        response = self.client.post(
+            reverse("tictactoe:api_login"),
+            {"username": self.user1.username, "password": self.password},
+        )
+        self.assertEqual(response.status_code, 415)
+
+    def test_list_boards(self) -> None:
+        self.client.login(username=self.user1.username, password=self.password)
+
+        response = self.client.get(reverse("tictactoe:api_boards"))
+        self.assertEqual(
+            {board["id"] for board in response.json()},
+            {self.board1.id, self.board3.id},
+        )
+
+        response = self.client.get(reverse("tictactoe:api_boards"), {"filter": "open"})
+        self.assertEqual(
+            {board["id"] for board in response.json()},
+            {self.board4.id, self.board5.id},
+        )
+
+    def test_create_board(self) -> None:
+        self.client.login(username=self.user1.username, password=self.password)
+        response = self.client.post(reverse("tictactoe:api_boards"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["crosses"], self.user1.username)
+        self.assertEqual(response.json()["turn"], FieldState.X.value)
+
+    def test_get_board_in_compact_formats(self) -> None:
+        Board.objects.filter(pk=self.board1.id).update(state="XO       ")
+        url = reverse("tictactoe:api_board", args=(self.board1.id,))
+
+        board = self.client.get(url).json()
+        self.assertEqual(board["state"], "XO       ")
+        self.assertEqual(board["version"], 2)
+        self.assertEqual(board["turn"], FieldState.X.value)
+        self.assertEqual(board["result"], "on_going")
+
+        # X is 1 and O is 2, the first field is the least significant digit
+        self.assertEqual(self.client.get(url, {"format": "int"}).json()["state"], 7)
+
+        response = self.client.get(url, {"version": 2})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_get_non_existing_board_returns_404(self) -> None:
+        response = self.client.get(reverse("tictactoe:api_board", args=(0,)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_join_board(self) -> None:
+        self.client.login(username=self.user1.username, password=self.password)
+
+        response = self.client.post(
+            reverse("tictactoe:api_join_board", args=(self.board4.id,))
+        )
+        self.assertEqual(response.json()["noughts"], self.user1.username)
+
+        response = self.client.post(
+            reverse("tictactoe:api_join_board", args=(self.board2.id,))
+        )
+        self.assertEqual(response.status_code, StatusCode.FORBIDDEN.value)
+
+    def test_play_batch_of_moves(self) -> None:
+        self.client.login(username=self.user1.username, password=self.password)
+        results = self.post_moves(
+            [
+                {"board": self.board1.id, "field": 4},
+                {"board": self.board1.id, "field": 0},
+                {"board": self.board2.id, "field": 0},
+                {"board": 0, "field": 0},
+            ]
+        )
+
+        self.assertEqual(results[0]["state"], "    X    ")
+        self.assertIn("error", results[1])
+        self.assertIn("error", results[2])
+        self.assertIn("error", results[3])
+        self.assertEqual(Board.objects.get(pk=self.board1.id).state, "    X    ")
+
+    def test_invalid_moves_are_rejected(self) -> None:
+        self.client.login(username=self.user1.username, password=self.password)
+        response = self.client.post(
+            reverse("tictactoe:api_moves"),
+            {"moves": [{"board": self.board1.id}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class AnalysisTest(TestCase):
+    def test_symmetries_are_all_different(self) -> None:
+        self.assertEqual(len(set(SYMMETRIES)), 8)
+
+    def test_symmetric_states_share_canonical_state(self) -> None:
+        canonical_states = {
+            canonicalize(state)[0]
+            for state in ("X        ", "  X      ", "      X  ", "        X")
+        }
+        self.assertEqual(len(canonical_states), 1)
+
+    def test_empty_board_is_a_tie(self) -> None:
+        analysis = analyse(" " * 9)
+        self.assertEqual(analysis.outcome, GameState.TIE)
+        self.assertEqual(analysis.best_fields, list(range(9)))
+
+    def test_best_moves_are_mapped_back_to_the_board(self) -> None:
+        # Crosses win by completing the top row or the left column
+        state = "XX X O OO"
+        analysis = analyse(state)
+        self.assertEqual(analysis.outcome, GameState.CROSSES_WON)
+        self.assertEqual(analysis.best_fields, [2, 6])
+
+        # In the same position rotated clockwise, those fields are the corners 8 and 0
+        analysis = analyse("".join(state[i] for i in ROTATION))
+        self.assertEqual(analysis.outcome, GameState.CROSSES_WON)
+        self.assertEqual(analysis.best_fields, [0, 8])
+
+        # Noughts must block the row of crosses
+        analysis = analyse("XX  O    ")
+        self.assertEqual(analysis.outcome, GameState.TIE)
+        self.assertEqual(analysis.best_fields, [2])
+
+    def test_finished_games_have_no_best_moves(self) -> None:
+        analysis = analyse("XXXOO    ")
+        self.assertEqual(analysis.outcome, GameState.CROSSES_WON)
+        self.assertEqual(analysis.best_fields, [])
+
+    def test_repeated_analyses_do_not_search(self) -> None:
+        analyse("X   O    ")
+        misses = solve.cache_info().misses
+        analyse("    O   X")
+        self.assertEqual(solve.cache_info().misses, misses)
+
+    def test_analysis_endpoint(self) -> None:
+        board = Board.objects.create(state="XX  O    ")
+        response = self.client.get(
+            reverse("tictactoe:api_board_analysis", args=(board.id,))
+        )
+        self.assertEqual(
+            response.json(),
+            {"id": board.id, "version": 3, "outcome": "tie", "best_moves": [2]},
+        )
+
+
+class PresenceTest(TestCase):
+    def setUp(self) -> None:
+        caches[settings.TICTACTOE_PRESENCE_CACHE].clear()
+        board_cache.clear()
+        self.now = 1000.0
+        self.tracker = PresenceTracker(clock=lambda: self.now)
+
+    def test_viewers_are_counted_once_per_board(self) -> None:
+        self.tracker.touch(1, "viewer1")
+        self.tracker.touch(1, "viewer1")
+        self.tracker.touch(1, "viewer2")
+        self.tracker.touch(2, "viewer1")
+        self.assertEqual(self.tracker.count(1), 2)
+        self.assertEqual(self.tracker.count(2), 1)
+        self.assertEqual(self.tracker.count(3), 0)
+
+    def test_viewers_expire_after_ttl(self) -> None:
+        self.tracker.touch(1, "viewer1")
+        self.tracker.touch(1, "viewer2")
+        self.assertEqual(self.tracker.count(1), 2)
+
+        # Only the second viewer keeps polling
+        self.now += settings.TICTACTOE_PRESENCE_TTL / 2
+        self.tracker.touch(1, "viewer2")
+        self.assertEqual(self.tracker.count(1), 2)
+        self.now += settings.TICTACTOE_PRESENCE_TTL / 2
+        self.tracker.touch(1, "viewer2")
+        self.assertEqual(self.tracker.count(1), 1)
+
+        self.now += settings.TICTACTOE_PRESENCE_TTL
+        self.assertEqual(self.tracker.count(1), 0)
+        self.assertEqual(self.tracker.hot_boards(), [])
+
+    def test_viewers_fit_in_presence_cache(self) -> None:
+        # Many more entries than the 300 of a cache with the default limit
+        for _ in range(5):
+            for viewer in range(600):
+                self.tracker.touch(viewer % 50, f"viewer{viewer}")
+
+        self.assertEqual(sum(self.tracker.count_many(range(50)).values()), 600)
+        self.assertEqual(len(self.tracker.hot_boards()), 50)
+
+    def test_evicted_counters_are_created_again(self) -> None:
+        # The entries are "added" but never stored, like if they were evicted at once
+        with mock.patch.object(self.tracker.cache, "add", return_value=True):
+            self.tracker.touch(1, "viewer1")
+        self.assertEqual(self.tracker.count(1), 1)
+        self.assertEqual(self.tracker.hot_boards(), [(1, 1)])
+
+    def test_concurrent_viewers_are_all_counted(self) -> None:
+        thread_count = 16
+        barrier = threading.Barrier(thread_count)
+
+        def touch(viewer: int) -> None:
+            barrier.wait()
+            self.tracker.touch(1, f"viewer{viewer}")
+            self.tracker.touch(2 + viewer, "viewer")
+
+        threads = [
+            threading.Thread(target=touch, args=(i,)) for i in range(thread_count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.tracker.count(1), thread_count)
+        self.assertEqual(len(self.tracker.hot_boards()), thread_count + 1)
+
+    def test_hot_boards_are_sorted_by_viewers(self) -> None:
+        for viewer in range(3):
+            self.tracker.touch(1, f"viewer{viewer}")
+        for viewer in range(5):
+            self.tracker.touch(2, f"viewer{viewer}")
+        self.assertEqual(self.tracker.hot_boards(), [(2, 5), (1, 3)])
+        self.assertEqual(self.tracker.hot_boards(limit=1), [(2, 5)])
+
+    def test_polling_board_counts_viewers(self) -> None:
+        board = Board.objects.create()
+        url = reverse("tictactoe:board_detail", args=(board.id,))
+        self.client.get(url)
+        Client(HTTP_USER_AGENT="Another browser").get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.context["viewer_count"], 2)
+        self.assertContains(response, "Viewers: 2")
+
+    def test_admin_reads_viewers_of_page_at_once(self) -> None:
+        for board in Board.objects.bulk_create([Board() for _ in range(3)]):
+            self.client.get(reverse("tictactoe:board_detail", args=(board.id,)))
+
+        User.objects.create_superuser(username="admin", password="admin")
+        self.client.login(username="admin", password="admin")
+        presence_cache = caches[settings.TICTACTOE_PRESENCE_CACHE]
+        with mock.patch.object(
+            presence_cache, "get_many", wraps=presence_cache.get_many
+        ) as get_many:
+            response = self.client.get(reverse("admin:tictactoe_board_changelist"))
+        get_many.assert_called_once()
+        self.assertContains(response, '<td class="field-viewer_count">1</td>', 3)
+
+    def test_admin_lists_hot_boards(self) -> None:
+        board = Board.objects.create()
+        self.client.get(reverse("tictactoe:board_detail", args=(board.id,)))
+
+        User.objects.create_superuser(username="admin", password="admin")
+        self.client.login(username="admin", password="admin")
+        response = self.client.get(reverse("admin:tictactoe_board_hot"))
+        self.assertEqual(response.context["board_counts"], [(board, 1)])
+
+
+class MoveThrottleTest(TestCase):
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.throttle = MoveThrottle(clock=lambda: self.now)
+
+    def test_repeated_move_is_duplicate_within_window(self) -> None:
+        self.assertEqual(self.throttle.check(1, 1, 0, 0), ThrottleResult.ALLOWED)
+        self.assertEqual(self.throttle.check(1, 1, 0, 0), ThrottleResult.DUPLICATE)
+
+        # Other users and boards are not affected
+        self.assertEqual(self.throttle.check(2, 1, 0, 0), ThrottleResult.ALLOWED)
+        self.assertEqual(self.throttle.check(1, 2, 0, 0), ThrottleResult.ALLOWED)
+
+        self.now += settings.TICTACTOE_DUPLICATE_MOVE_SECONDS
+        self.assertEqual(self.throttle.check(1, 1, 0, 0), ThrottleResult.ALLOWED)
+
+    def test_forgotten_move_is_not_duplicate(self) -> None:
+        self.throttle.check(1, 1, 0, 0)
+        self.throttle.forget_move(1, 1, 0, 0)
+        self.assertEqual(self.throttle.check(1, 1, 0, 0), ThrottleResult.ALLOWED)
+
+    def test_moves_are_rate_limited(self) -> None:
+        for col in range(settings.TICTACTOE_MOVE_BURST):
+            self.assertEqual(self.throttle.check(1, 1, 0, col), ThrottleResult.ALLOWED)
+        self.assertEqual(self.throttle.check(1, 1, 1, 0), ThrottleResult.RATE_LIMITED)
+
+        self.now += 1 / settings.TICTACTOE_MOVE_RATE
+        self.assertEqual(self.throttle.check(1, 1, 1, 0), ThrottleResult.ALLOWED)
+        self.assertEqual(self.throttle.check(1, 1, 1, 1), ThrottleResult.RATE_LIMITED)
+
+    @override_settings(TICTACTOE_MOVE_THROTTLE_SIZE=2)
+    def test_least_recently_used_pairs_are_forgotten(self) -> None:
+        self.throttle.check(1, 1, 0, 0)
+        self.throttle.check(1, 2, 0, 0)
+        self.throttle.check(1, 1, 0, 0)
+        self.throttle.check(1, 3, 0, 0)
+        self.assertEqual(list(self.throttle.buckets), [(1, 1), (1, 3)])
+
+
+@override_settings(
+    TICTACTOE_MOVE_BURST=1000,
+    TICTACTOE_MOVE_RATE=1000,
+    TICTACTOE_DUPLICATE_MOVE_SECONDS=0,
+)
+class ConcurrencyStressTest(TransactionTestCase):
+    """Fires concurrent requests from several threads, each one with its own database
+    connection, and checks that no update is lost.
+    """
+
+    password = "test"
+    thread_count = 8
+
+    def setUp(self) -> None:
+        board_cache.clear()
+        move_throttle.clear()
+        self.users = [
+            User.objects.create_user(username=f"test{i}", password=self.password)
+            for i in range(self.thread_count)
+        ]
+
+    def create_client(self, user: User) -> Client:
+        client = Client()
+        client.login(username=user.username, password=self.password)
+        return client
+
+    def run_concurrently(self, target: Callable[[int], None]) -> None:
+        barrier = threading.Barrier(self.thread_count)
+        errors: list[BaseException] = []
+
+        def run(i: int) -> None:
+            try:
+                barrier.wait()
+                target(i)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=run, args=(i,)) for i in range(self.thread_count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+    def test_concurrent_joins_fill_each_seat_once(self) -> None:
+        boards = [Board.objects.create() for _ in range(10)]
+        clients = [self.create_client(user) for user in self.users]
+        joined_users: list[list[User]] = [[] for _ in boards]
+
+        def join(i: int) -> None:
+            for board_index, board in enumerate(boards):
+                response = clients[i].post(
+                    reverse("tictactoe:join_board", args=(board.id,))
+                )
+                if response.status_code == 302:
+                    joined_users[board_index].append(self.users[i])
+                else:
+                    self.assertEqual(response.status_code, StatusCode.FORBIDDEN.value)
+
+        self.run_concurrently(join)
+
+        for board, users in zip(boards, joined_users):
+            board.refresh_from_db()
+            self.assertEqual(len(users), 2)
+            self.assertCountEqual(users, [board.crosses_player, board.noughts_player])
+
+    def test_concurrent_moves_are_not_lost(self) -> None:
+        # Every board is played by four threads, two for each player, like if players
+        # clicked on several fields at once
+        boards = [
+            Board.objects.create(
+                crosses_player=self.users[2 * i], noughts_player=self.users[2 * i + 1]
+            )
+            for i in range(self.thread_count // 4)
+        ]
+        clients = [
+            self.create_client(self.users[2 * (i // 4) + i % 2])
+            for i in range(self.thread_count)
+        ]
+        accepted_moves = [0] * len(boards)
+        lock = threading.Lock()
+
+        def play(i: int) -> None:
+            board_id = boards[i // 4].id
+            fields = [(row, col) for row in range(3) for col in range(3)]
+            random.shuffle(fields)
+            # Keep trying all fields until the game is over
+            for _ in range(20):
+                for row, col in fields:
+                    response = clients[i].post(
+                        reverse("tictactoe:set_field_state", args=(board_id, row, col))
+                    )
+                    if response.status_code == 200:
+                        with lock:
+                            accepted_moves[i // 4] += 1
+                if Game(Board.objects.get(pk=board_id)).state != GameState.ON_GOING:
+                    return
+
+        self.run_concurrently(play)
+
+        for board, move_count in zip(boards, accepted_moves):
+            board.refresh_from_db()
+            crosses_count = board.state.count(FieldState.X.value)
+            noughts_count = board.state.count(FieldState.O.value)
+
+            # Every accepted move is on the board and the players took turns
+            self.assertEqual(crosses_count + noughts_count, move_count)
+            self.assertIn(crosses_count - noughts_count, (0, 1))
+
+            # Nobody moved after the game was won, so there is a single winner
+            game = Game(board)
+            self.assertNotEqual(game.state, GameState.ON_GOING)
+            if game.state == GameState.CROSSES_WON:
+                self.assertEqual(crosses_count, noughts_count + 1)
+                # Crosses are checked first, so also check that noughts did not win
+                board.state = board.state.replace(FieldState.X.value, " ")
+                self.assertNotEqual(Game(board).state, GameState.NOUGHTS_WON)
+            elif game.state == GameState.NOUGHTS_WON:
+                self.assertEqual(crosses_count, noughts_count)
+
+
 class GameTest(TestCase):
     @classmethod
     def setUpTestData(cls) -> None:
@@ -244,3 +1033,320 @@ class GameTest(TestCase):
         # In a finished game, it is not possible to occupy more fields
         self.board.state = "XXX      "
         self.assertRaises(Exception, self.game.occupy_field, 1, 1, FieldState.X)
+
+
+class BulkCreateBoardsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user1 = User.objects.create_user(username="test1")
+        cls.user2 = User.objects.create_user(username="test2")
+
+    def test_create_boards_assigns_players_to_all_boards(self) -> None:
+        created_count = create_boards(
+            25, crosses_player=self.user1, noughts_player=self.user2, batch_size=10
+        )
+        self.assertEqual(created_count, 25)
+        self.assertEqual(
+            Board.objects.filter(
+                crosses_player=self.user1, noughts_player=self.user2
+            ).count(),
+            25,
+        )
+
+    def test_create_boards_uses_batches(self) -> None:
+        # One query per batch, plus creating and releasing the transaction savepoint
+        with self.assertNumQueries(3 + 2):
+            create_boards(25, batch_size=10)
+
+    def test_create_boards_with_invalid_batch_size_raises_exception(self) -> None:
+        self.assertRaises(ValueError, create_boards, 1, batch_size=0)
+
+    def test_create_boards_command(self) -> None:
+        call_command("create_boards", 5, "--crosses", "test1", stdout=StringIO())
+        self.assertEqual(
+            Board.objects.filter(
+                crosses_player=self.user1, noughts_player=None
+            ).count(),
+            5,
+        )
+
+    def test_create_boards_command_with_unknown_user_fails(self) -> None:
+        self.assertRaises(
+            CommandError, call_command, "create_boards", 5, "--noughts", "unknown"
+        )
+
+    def test_seed_boards_command(self) -> None:
+        call_command(
+            "seed_boards", "--users", 3, "--boards-per-user", 4, stdout=StringIO()
+        )
+        seed_users = User.objects.filter(username__startswith="seed")
+        self.assertEqual(seed_users.count(), 3)
+        for user in seed_users:
+            self.assertEqual(Board.objects.filter(crosses_player=user).count(), 4)
+            self.assertEqual(Board.objects.filter(noughts_player=user).count(), 4)
+
+
+class ExportImportBoardsTest(TicTacToeViewTest):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = Path(temp_dir.name)
+
+    def export_and_import(self, filename: str, *import_args: str) -> None:
+        path = str(self.temp_dir / filename)
+        call_command("export_boards", path, "--chunk-size", 2, stderr=StringIO())
+        Board.objects.all().delete()
+        call_command(
+            "import_boards", path, "--batch-size", 2, *import_args, stdout=StringIO()
+        )
+
+    def test_export_writes_one_board_per_line(self) -> None:
+        output = StringIO()
+        call_command("export_boards", stdout=output, stderr=StringIO())
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), Board.objects.count())
+        self.assertEqual(
+            json.loads(lines[0]),
+            {
+                "id": self.board1.id,
+                "crosses": self.user1.username,
+                "noughts": self.user2.username,
+                "state": self.board1.state,
+            },
+        )
+
+    def test_exported_boards_are_imported_back(self) -> None:
+        Board.objects.filter(pk=self.board1.id).update(state="X   O    ")
+        boards = list(Board.objects.order_by("id").values())
+
+        for filename in ("boards.jsonl", "boards.jsonl.gz"):
+            self.export_and_import(filename)
+            self.assertEqual(list(Board.objects.order_by("id").values()), boards)
+
+    def test_import_with_new_ids(self) -> None:
+        board_ids = set(Board.objects.values_list("id", flat=True))
+        self.export_and_import("boards.jsonl", "--new-ids")
+        self.assertEqual(Board.objects.count(), len(board_ids))
+        self.assertFalse(board_ids & set(Board.objects.values_list("id", flat=True)))
+
+    def test_new_boards_get_ids_after_the_imported_ones(self) -> None:
+        self.export_and_import("boards.jsonl")
+        board = Board.objects.create()
+        self.assertEqual(board.id, Board.objects.order_by("id").last().id)
+        self.assertGreater(board.id, self.board5.id)
+
+    def test_import_of_malformed_boards_fails(self) -> None:
+        path = self.temp_dir / "boards.jsonl"
+        path.write_text('{"id":1,"crosses":null,"noughts":null}\n')
+        self.assertRaises(CommandError, call_command, "import_boards", str(path))
+
+    def test_import_of_invalid_states_fails(self) -> None:
+        path = self.temp_dir / "boards.jsonl"
+        for state in ("ZZZZZZZZZ", "X", "XOX OXO XO", 0):
+            path.write_text(
+                json.dumps({"id": 1, "crosses": None, "noughts": None, "state": state})
+            )
+            self.assertRaises(
+                CommandError, call_command, "import_boards", str(path), "--new-ids"
+            )
+
+    def test_import_of_taken_ids_fails(self) -> None:
+        path = str(self.temp_dir / "boards.jsonl")
+        call_command("export_boards", path, stderr=StringIO())
+        self.assertRaises(CommandError, call_command, "import_boards", path)
+
+    def test_import_with_invalid_batch_size_fails(self) -> None:
+        path = str(self.temp_dir / "boards.jsonl")
+        call_command("export_boards", path, stderr=StringIO())
+        self.assertRaises(
+            CommandError, call_command, "import_boards", path, "--batch-size", 0
+        )
+
+    def test_import_with_missing_users_fails(self) -> None:
+        path = self.temp_dir / "boards.jsonl"
+        path.write_text(
+            '{"id":1,"crosses":"unknown","noughts":null,"state":"         "}\n'
+        )
+        initial_boards_count = Board.objects.count()
+        self.assertRaises(CommandError, call_command, "import_boards", str(path))
+        self.assertEqual(Board.objects.count(), initial_boards_count)
+
+
+class TournamentTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.password = "test"
+        cls.users = [
+            User.objects.create_user(username=f"test{i}", password=cls.password)
+            for i in range(5)
+        ]
+
+    def setUp(self) -> None:
+        board_cache.clear()
+        move_throttle.clear()
+
+    def create_tournament(self, kind: Tournament.Kind, player_count: int) -> Tournament:
+        tournament = Tournament.objects.create(name="Test", kind=kind)
+        tournament.players.set(self.users[:player_count])
+        start_tournament(tournament)
+        return tournament
+
+    def finish_current_round(self, tournament: Tournament, state: str) -> None:
+        for tournament_match in Match.objects.filter(
+            tournament=tournament, round=tournament.current_round, is_finished=False
+        ).select_related("board"):
+            board = tournament_match.board
+            assert board is not None
+            board.state = state
+            board.save()
+            on_board_finished(board)
+        tournament.refresh_from_db()
+
+    def test_round_robin_pairings_match_every_player_once(self) -> None:
+        for player_count in (4, 5):
+            player_ids = list(range(player_count))
+            round_count = player_count - 1 if player_count % 2 == 0 else player_count
+            pairs = [
+                frozenset(pairing)
+                for round_number in range(1, round_count + 1)
+                for pairing in round_robin_pairings(player_ids, round_number)
+            ]
+            self.assertEqual(len(pairs), player_count * (player_count - 1) // 2)
+            self.assertEqual(len(set(pairs)), len(pairs))
+
+    def test_bracket_pairings_give_byes_in_first_round_only(self) -> None:
+        self.assertEqual(bracket_pairings([1, 2, 3, 4]), [(1, 2), (3, 4)])
+        self.assertEqual(
+            bracket_pairings([1, 2, 3, 4, 5, 6]),
+            [(1, None), (2, None), (3, 4), (5, 6)],
+        )
+
+    def test_tournament_needs_two_players(self) -> None:
+        self.assertRaises(
+            ValueError, self.create_tournament, Tournament.Kind.ROUND_ROBIN, 1
+        )
+
+    def test_single_elimination_advances_winners(self) -> None:
+        tournament = self.create_tournament(Tournament.Kind.SINGLE_ELIMINATION, 5)
+        self.assertEqual(tournament.current_round, 1)
+        self.assertEqual(tournament.pending_matches, 1)
+
+        # Crosses always win. The first three players got a bye in the first round, so
+        # four players are left and nobody gets a bye afterwards
+        self.finish_current_round(tournament, "XXXOO    ")
+        self.assertEqual(tournament.current_round, 2)
+        self.assertEqual(tournament.pending_matches, 2)
+        self.finish_current_round(tournament, "XXXOO    ")
+        self.assertEqual(tournament.current_round, 3)
+        self.assertEqual(tournament.pending_matches, 1)
+        self.finish_current_round(tournament, "XXXOO    ")
+
+        self.assertTrue(tournament.is_finished)
+        self.assertEqual(tournament.winner, self.users[0])
+
+    def test_single_elimination_replays_ties(self) -> None:
+        tournament = self.create_tournament(Tournament.Kind.SINGLE_ELIMINATION, 2)
+        tournament_match = Match.objects.get(tournament=tournament)
+        old_board = tournament_match.board
+
+        self.finish_current_round(tournament, "XOXXOXOXO")
+        tournament_match.refresh_from_db()
+        self.assertFalse(tournament_match.is_finished)
+        self.assertNotEqual(tournament_match.board, old_board)
+        assert tournament_match.board is not None and old_board is not None
+        self.assertEqual(
+            tournament_match.board.crosses_player, old_board.noughts_player
+        )
+        self.assertEqual(tournament.pending_matches, 1)
+
+    def test_round_robin_schedules_all_rounds(self) -> None:
+        tournament = self.create_tournament(Tournament.Kind.ROUND_ROBIN, 4)
+        for _ in range(3):
+            self.assertFalse(tournament.is_finished)
+            self.assertEqual(tournament.pending_matches, 2)
+            self.finish_current_round(tournament, "XOXXOXOXO")
+
+        self.assertTrue(tournament.is_finished)
+        self.assertEqual(Match.objects.filter(tournament=tournament).count(), 6)
+        self.assertIsNone(tournament.winner)
+
+    def test_tournaments_cannot_be_added_in_admin(self) -> None:
+        User.objects.create_superuser(username="admin", password="admin")
+        self.client.login(username="admin", password="admin")
+        response = self.client.get(reverse("admin:tictactoe_tournament_add"))
+        self.assertEqual(response.status_code, 403)
+
+        tournament = self.create_tournament(Tournament.Kind.ROUND_ROBIN, 2)
+        response = self.client.get(
+            reverse("admin:tictactoe_tournament_change", args=(tournament.id,))
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_winning_move_advances_tournament(self) -> None:
+        tournament = self.create_tournament(Tournament.Kind.SINGLE_ELIMINATION, 2)
+        board = Match.objects.get(tournament=tournament).board
+        assert board is not None
+        board.state = "XX OO    "
+        board.save()
+
+        self.client.login(username=self.users[0].username, password=self.password)
+        self.client.post(reverse("tictactoe:set_field_state", args=(board.id, 0, 2)))
+
+        tournament.refresh_from_db()
+        self.assertTrue(tournament.is_finished)
+        self.assertEqual(tournament.winner, self.users[0])
+
+
+@override_settings(TICTACTOE_REPLICA_DATABASES=["replica"])
+class PrimaryReplicaRoutingTest(SimpleTestCase):
+    databases = {"default"}
+
+    def setUp(self) -> None:
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        self.middleware = PrimaryReplicaMiddleware(
+            lambda request: HttpResponse(self.router.db_for_read(Board))
+        )
+
+    def test_reads_go_to_replicas_and_writes_to_primary(self) -> None:
+        with use_replicas():
+            self.assertEqual(self.router.db_for_read(Board), "replica")
+            self.assertEqual(self.router.db_for_write(Board), "default")
+
+    def test_reads_outside_requests_go_to_primary(self) -> None:
+        # E.g. management commands, which read what they have just written
+        self.assertEqual(self.router.db_for_read(Board), "default")
+
+    def test_reads_go_to_primary_without_replicas(self) -> None:
+        with self.settings(TICTACTOE_REPLICA_DATABASES=[]), use_replicas():
+            self.assertEqual(self.router.db_for_read(Board), "default")
+
+    def test_reads_go_to_primary_when_forced(self) -> None:
+        with use_replicas():
+            with use_primary():
+                self.assertEqual(self.router.db_for_read(Board), "default")
+            self.assertEqual(self.router.db_for_read(Board), "replica")
+
+    def test_board_cache_loads_boards_from_primary(self) -> None:
+        # The replica does not exist, so reading from it would fail differently
+        with use_replicas():
+            self.assertRaises(Board.DoesNotExist, board_cache.get_or_load, 0)
+
+    def test_reads_inside_transactions_go_to_primary(self) -> None:
+        with use_replicas(), transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Board), "default")
+
+    def test_get_requests_read_from_replicas(self) -> None:
+        response = self.middleware(self.factory.get("/"))
+        self.assertEqual(response.content, b"replica")
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_post_requests_read_from_primary_and_pin_client(self) -> None:
+        response = self.middleware(self.factory.post("/"))
+        self.assertEqual(response.content, b"default")
+        self.assertIn(PIN_COOKIE_NAME, response.cookies)
+
+        # The next requests of the same client see its own writes
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE_NAME] = response.cookies[PIN_COOKIE_NAME].value
+        self.assertEqual(self.middleware(request).content, b"default")
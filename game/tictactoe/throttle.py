@@ -0,0 +1,101 @@
+import enum
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from django.conf import settings
+
+TOO_MANY_MOVES_MESSAGE = "Too many moves, please slow down"
+
+
+class ThrottleResult(enum.Enum):
+    ALLOWED = enum.auto()
+    # Same move as the previous one of the user on the board, e.g. after a double click
+    DUPLICATE = enum.auto()
+    RATE_LIMITED = enum.auto()
+
+
+class MoveBucket:
+    tokens: float
+    updated_at: float
+    last_field: tuple[int, int] | None
+    last_field_at: float
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.tokens = tokens
+        self.updated_at = now
+        self.last_field = None
+        self.last_field_at = now
+
+
+class MoveThrottle:
+    """Filters the move requests of each user on each board before they reach the
+    database.
+
+    Repeating the last move within TICTACTOE_DUPLICATE_MOVE_SECONDS is reported as a
+    duplicate, so it can be ignored, unless the move failed and was forgotten. Other
+    moves are limited with a token bucket that allows bursts of TICTACTOE_MOVE_BURST
+    moves and refills at TICTACTOE_MOVE_RATE moves per second.
+
+    The state lives in the memory of the process and only the most recently used
+    TICTACTOE_MOVE_THROTTLE_SIZE user and board pairs are kept.
+    """
+
+    clock: Callable[[], float]
+    buckets: OrderedDict[tuple[int, int], MoveBucket]
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def check(self, user_id: int, board_id: int, row: int, col: int) -> ThrottleResult:
+        now = self.clock()
+        capacity = settings.TICTACTOE_MOVE_BURST
+
+        with self.lock:
+            key = (user_id, board_id)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = MoveBucket(capacity, now)
+                if len(self.buckets) > settings.TICTACTOE_MOVE_THROTTLE_SIZE:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+
+            if (
+                bucket.last_field == (row, col)
+                and now - bucket.last_field_at
+                < settings.TICTACTOE_DUPLICATE_MOVE_SECONDS
+            ):
+                return ThrottleResult.DUPLICATE
+
+            elapsed_time = now - bucket.updated_at
+            bucket.tokens = min(
+                capacity, bucket.tokens + elapsed_time * settings.TICTACTOE_MOVE_RATE
+            )
+            bucket.updated_at = now
+            if bucket.tokens < 1:
+                return ThrottleResult.RATE_LIMITED
+
+            bucket.tokens -= 1
+            bucket.last_field = (row, col)
+            bucket.last_field_at = now
+            return ThrottleResult.ALLOWED
+
+    def forget_move(self, user_id: int, board_id: int, row: int, col: int) -> None:
+        """Stops treating repeats of the move as duplicates. Must be called when an
+        allowed move fails, so the user can retry it.
+        """
+        with self.lock:
+            bucket = self.buckets.get((user_id, board_id))
+            if bucket is not None and bucket.last_field == (row, col):
+                bucket.last_field = None
+
+    def clear(self) -> None:
+        with self.lock:
+            self.buckets.clear()
+
+
+move_throttle = MoveThrottle()
@@ -0,0 +1,201 @@
+from typing import Sequence
+
+from django.db import transaction
+from django.db.models import Count
+
+from .bulk import DEFAULT_BATCH_SIZE
+from .game import Game, GameState
+from .models import Board, Match, Tournament
+
+# A pair of player ids. If the second player is None the first one gets a bye
+Pairing = tuple[int, int | None]
+
+
+def start_tournament(tournament: Tournament) -> None:
+    """Schedules the first round of a tournament that has not started yet."""
+    player_ids = get_player_ids(tournament)
+    if len(player_ids) < 2:
+        raise ValueError("A tournament needs at least two players")
+    if tournament.current_round != 0:
+        raise ValueError(f"Tournament {tournament.id} has already started")
+
+    with transaction.atomic():
+        if tournament.kind == Tournament.Kind.ROUND_ROBIN:
+            schedule_round(tournament, round_robin_pairings(player_ids, 1))
+        else:
+            schedule_round(tournament, bracket_pairings(player_ids))
+
+
+def on_board_finished(board: Board) -> None:
+    """Records the result of a tournament board and advances the tournament.
+
+    It must be called whenever a move ends a game. Only the match of the given board
+    and its tournament are looked up, so finishing a game is cheap regardless of the
+    size of the tournament.
+    """
+    tournament_match = Match.objects.filter(board=board, is_finished=False).first()
+    if tournament_match is None:
+        return
+
+    match Game(board).state:
+        case GameState.CROSSES_WON:
+            winner_id = board.crosses_player_id
+        case GameState.NOUGHTS_WON:
+            winner_id = board.noughts_player_id
+        case GameState.TIE:
+            winner_id = None
+        case _:
+            return
+
+    with transaction.atomic():
+        tournament = Tournament.objects.select_for_update().get(
+            pk=tournament_match.tournament_id
+        )
+
+        if winner_id is None and tournament.kind == Tournament.Kind.SINGLE_ELIMINATION:
+            # Brackets need a winner, so ties are replayed with swapped sides
+            tournament_match.board = Board.objects.create(
+                crosses_player_id=board.noughts_player_id,
+                noughts_player_id=board.crosses_player_id,
+            )
+            tournament_match.save(update_fields=["board"])
+            return
+
+        # The filter on is_finished protects against recording a result twice
+        updated_count = Match.objects.filter(
+            pk=tournament_match.pk, is_finished=False
+        ).update(is_finished=True, winner_id=winner_id)
+        if updated_count == 0:
+            return
+
+        tournament.pending_matches -= 1
+        tournament.save(update_fields=["pending_matches"])
+
+        if tournament.pending_matches == 0:
+            advance_tournament(tournament)
+
+
+def advance_tournament(tournament: Tournament) -> None:
+    if tournament.kind == Tournament.Kind.ROUND_ROBIN:
+        player_ids = get_player_ids(tournament)
+        if tournament.current_round < round_robin_round_count(len(player_ids)):
+            schedule_round(
+                tournament,
+                round_robin_pairings(player_ids, tournament.current_round + 1),
+            )
+        else:
+            finish_tournament(tournament, get_round_robin_winner_id(tournament))
+    else:
+        winner_ids = list(
+            Match.objects.filter(tournament=tournament, round=tournament.current_round)
+            .order_by("index")
+            .values_list("winner_id", flat=True)
+        )
+        if len(winner_ids) == 1:
+            finish_tournament(tournament, winner_ids[0])
+        else:
+            schedule_round(tournament, bracket_pairings(winner_ids))
+
+
+def schedule_round(tournament: Tournament, pairings: list[Pairing]) -> None:
+    """Creates the boards and matches of the next round of the tournament."""
+    boards = Board.objects.bulk_create(
+        [
+            Board(crosses_player_id=crosses_id, noughts_player_id=noughts_id)
+            for crosses_id, noughts_id in pairings
+            if noughts_id is not None
+        ],
+        batch_size=DEFAULT_BATCH_SIZE,
+    )
+    board_iterator = iter(boards)
+
+    tournament.current_round += 1
+    matches = []
+    for index, (crosses_id, noughts_id) in enumerate(pairings):
+        tournament_match = Match(
+            tournament=tournament, round=tournament.current_round, index=index
+        )
+        if noughts_id is None:
+            tournament_match.is_finished = True
+            tournament_match.winner_id = crosses_id
+        else:
+            tournament_match.board = next(board_iterator)
+        matches.append(tournament_match)
+    Match.objects.bulk_create(matches, batch_size=DEFAULT_BATCH_SIZE)
+
+    tournament.pending_matches = len(boards)
+    tournament.save(update_fields=["current_round", "pending_matches"])
+
+    if tournament.pending_matches == 0:
+        advance_tournament(tournament)
+
+
+def finish_tournament(tournament: Tournament, winner_id: int | None) -> None:
+    tournament.is_finished = True
+    tournament.winner_id = winner_id
+    tournament.save(update_fields=["is_finished", "winner"])
+
+
+def get_player_ids(tournament: Tournament) -> list[int]:
+    return list(tournament.players.order_by("id").values_list("id", flat=True))
+
+
+def get_round_robin_winner_id(tournament: Tournament) -> int | None:
+    # Players with the same amount of wins are sorted by id, so the result is stable
+    return (
+        Match.objects.filter(tournament=tournament, winner__isnull=False)
+        .values("winner_id")
+        .annotate(wins=Count("id"))
+        .order_by("-wins", "winner_id")
+        .values_list("winner_id", flat=True)
+        .first()
+    )
+
+
+def bracket_pairings(player_ids: Sequence[int]) -> list[Pairing]:
+    """Pairs consecutive players.
+
+    If the number of players is not a power of two, the first players get a bye so
+    that the second round has a power of two players and no more byes are needed.
+    """
+    bracket_size = 1 << (len(player_ids) - 1).bit_length()
+    bye_count = bracket_size - len(player_ids)
+
+    pairings: list[Pairing] = [
+        (player_id, None) for player_id in player_ids[:bye_count]
+    ]
+    for i in range(bye_count, len(player_ids), 2):
+        pairings.append((player_ids[i], player_ids[i + 1]))
+    return pairings
+
+
+def round_robin_round_count(player_count: int) -> int:
+    return player_count - 1 if player_count % 2 == 0 else player_count
+
+
+def round_robin_pairings(player_ids: list[int], round_number: int) -> list[Pairing]:
+    """Returns the pairings of a round-robin round using the circle method.
+
+    The first player stays fixed while the rest rotate one position every round, so
+    every player meets every other player exactly once. With an odd number of players
+    an empty seat is added, and whoever is paired with it sits the round out.
+    """
+    seats: list[int | None] = list(player_ids)
+    if len(seats) % 2 != 0:
+        seats.append(None)
+
+    rotation = (round_number - 1) % (len(seats) - 1)
+    rotating_seats = seats[1:]
+    rotating_seats = rotating_seats[-rotation:] + rotating_seats[:-rotation]
+    seats = seats[:1] + rotating_seats
+
+    pairings: list[Pairing] = []
+    for i in range(len(seats) // 2):
+        first_id, second_id = seats[i], seats[-1 - i]
+        # Swap sides every other round so players alternate between crosses and noughts
+        if round_number % 2 == 0:
+            first_id, second_id = second_id, first_id
+
+        if first_id is not None and second_id is not None:
+            pairings.append((first_id, second_id))
+    return pairings
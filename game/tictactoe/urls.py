@@ -1,20 +1,36 @@
 from django.urls import URLPattern, path
 
-from . import views
+from . import api, views
 
 app_name = "tictactoe"
 
+# Endpoints of the game itself, which are also served by the game workers (see
+# game/urls_worker.py). They must not render pages that link to other URLs
+game_urlpatterns: list[URLPattern] = [
+    path("boards/detail/<int:board_id>/", views.board_detail, name="board_detail"),
+    path(
+        "boards/set_field_state/<int:board_id>/<int:row>/<int:col>",
+        views.set_field_state,
+        name="set_field_state",
+    ),
+    path("api/login/", api.login, name="api_login"),
+    path("api/boards/", api.boards, name="api_boards"),
+    path("api/boards/<int:board_id>/", api.board, name="api_board"),
+    path(
+        "api/boards/<int:board_id>/analysis/",
+        api.board_analysis,
+        name="api_board_analysis",
+    ),
+    path("api/boards/<int:board_id>/join/", api.join_board, name="api_join_board"),
+    path("api/moves/", api.moves, name="api_moves"),
+]
+
 urlpatterns: list[URLPattern] = [
     path("", views.index, name="index"),
     path("boards/user_boards/", views.user_boards, name="user_boards"),
     path("boards/open_boards/", views.open_boards, name="open_boards"),
     path("boards/create/", views.create_board, name="create_board"),
     path("boards/<int:board_id>/", views.board, name="board"),
-    path("boards/detail/<int:board_id>/", views.board_detail, name="board_detail"),
     path("boards/join/<int:board_id>/", views.join_board, name="join_board"),
-    path(
-        "boards/set_field_state/<int:board_id>/<int:row>/<int:col>",
-        views.set_field_state,
-        name="set_field_state",
-    ),
+    *game_urlpatterns,
 ]
@@ -11,8 +11,11 @@ from django.http import (
 from django.shortcuts import render
 from django.urls import reverse
 
+from . import actions, presence
+from .board_cache import board_cache
 from .game import Game, GameState
 from .models import Board, FieldState
+from .throttle import TOO_MANY_MOVES_MESSAGE, ThrottleResult, move_throttle
 
 
 class FieldInfo:
@@ -42,8 +45,8 @@ def user_boards(request: HttpRequest) -> HttpResponse:
 
     if request.user.is_authenticated:
         board_list = Board.objects.filter(
-            crosses_player=request.user
-        ) | Board.objects.filter(noughts_player=request.user)
+            Q(crosses_player=request.user) | Q(noughts_player=request.user)
+        ).select_related("crosses_player", "noughts_player")
 
     context: dict[str, Any] = {"board_list": board_list}
     return render(request, "tictactoe/board_list.html", context)
@@ -56,7 +59,7 @@ def open_boards(request: HttpRequest) -> HttpResponse:
         board_list = Board.objects.filter(
             (Q(crosses_player=None) & ~Q(noughts_player=request.user))
             | (~Q(crosses_player=request.user) & Q(noughts_player=None))
-        )
+        ).select_related("crosses_player", "noughts_player")
 
     context: dict[str, Any] = {"board_list": board_list}
     return render(request, "tictactoe/board_list.html", context)
@@ -64,22 +67,20 @@ def open_boards(request: HttpRequest) -> HttpResponse:
 
 def board(request: HttpRequest, board_id: int) -> HttpResponse:
     context = generate_board_detail_context(board_id)
+    context |= {"viewer_count": track_viewer(request, board_id)}
 
     if request.user.is_authenticated:
-        board = Board.objects.get(pk=board_id)
-        if (
-            board.crosses_player != request.user
-            and board.noughts_player != request.user
-        ):
+        board = context["board"]
+        if request.user.id not in (board.crosses_player_id, board.noughts_player_id):
             context |= {"user_can_join": True}
 
     return render(request, "tictactoe/board.html", context)
 
 
 def board_detail(request: HttpRequest, board_id: int) -> HttpResponse:
-    return render(
-        request, "tictactoe/board_detail.html", generate_board_detail_context(board_id)
-    )
+    context = generate_board_detail_context(board_id)
+    context |= {"viewer_count": track_viewer(request, board_id)}
+    return render(request, "tictactoe/board_detail.html", context)
 
 
 def join_board(request: HttpRequest, board_id: int) -> HttpResponse:
@@ -87,18 +88,17 @@ def join_board(request: HttpRequest, board_id: int) -> HttpResponse:
         return HttpResponseForbidden("You must be logged in to perform this action")
 
     try:
-        board = Board.objects.get(pk=board_id)
+        # Writes always start from the database, and then update the cached board
+        board = Board.objects.select_related("crosses_player", "noughts_player").get(
+            pk=board_id
+        )
     except Board.DoesNotExist:
         raise Http404(f"Board {id} does not exist")
 
-    if not board.crosses_player:
-        board.crosses_player = request.user  # type: ignore
-        board.save()
-    elif not board.noughts_player:
-        board.noughts_player = request.user  # type: ignore
-        board.save()
-    else:
-        return HttpResponseForbidden("No free space available to join board")
+    try:
+        actions.join_board(board, request.user)  # type: ignore
+    except actions.ForbiddenAction as e:
+        return HttpResponseForbidden(str(e))
 
     redirect_url = reverse("tictactoe:board", args=(board_id,))
     if request.headers.get("HX-Request"):
@@ -118,23 +118,27 @@ def set_field_state(
     if not request.user.is_authenticated:
         return HttpResponseForbidden("You must be logged in to perform this action")
 
+    match move_throttle.check(request.user.id, board_id, row, col):
+        case ThrottleResult.DUPLICATE:
+            # The first request already answers with the board. Returning no content
+            # keeps HTMX from swapping it or showing an error
+            return HttpResponse(status=204)
+        case ThrottleResult.RATE_LIMITED:
+            return HttpResponse(TOO_MANY_MOVES_MESSAGE, status=429)
+
     try:
-        board = Board.objects.get(pk=board_id)
+        # Writes always start from the database, and then update the cached board
+        board = Board.objects.select_related("crosses_player", "noughts_player").get(
+            pk=board_id
+        )
     except Board.DoesNotExist:
-        raise Http404(f"Board {id} does not exist")
-
-    if request.user == board.crosses_player:
-        new_field_state = FieldState.X
-    elif request.user == board.noughts_player:
-        new_field_state = FieldState.O
-    else:
-        return HttpResponseForbidden("You must join the board to perform this action")
+        move_throttle.forget_move(request.user.id, board_id, row, col)
+        raise Http404(f"Board {board_id} does not exist")
 
-    game = Game(board)
     try:
-        game.occupy_field(row, col, new_field_state)
-        board.save()
+        actions.play_move(board, request.user, row, col)  # type: ignore
     except Exception as e:
+        move_throttle.forget_move(request.user.id, board_id, row, col)
         return HttpResponseForbidden(str(e))
 
     return board_detail(request, board_id)
@@ -160,7 +164,7 @@ def create_board(request: HttpRequest) -> HttpResponse:
 
 def generate_board_detail_context(board_id: int) -> dict[str, Any]:
     try:
-        board = Board.objects.get(pk=board_id)
+        board = board_cache.get_or_load(board_id)
     except Board.DoesNotExist:
         raise Http404(f"Board {board_id} does not exist")
 
@@ -185,3 +189,9 @@ def generate_board_detail_context(board_id: int) -> dict[str, Any]:
         "board": board,
         "field_infos": field_infos,
     }
+
+
+def track_viewer(request: HttpRequest, board_id: int) -> int:
+    """Records that the client is viewing the board and returns the number of viewers."""
+    presence.tracker.touch(board_id, presence.get_viewer_id(request))
+    return presence.tracker.count(board_id)